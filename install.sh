@@ -10,9 +10,25 @@ program_dir=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 install -Dm755 "$program_dir/src/app.py" "/usr/share/$pkgname/app.py"
 
 # Install Python files
+install -Dm644 "$program_dir/src/yawns_app.py" "/usr/share/$pkgname/yawns_app.py"
 install -Dm644 "$program_dir/src/yawns_manager.py" "/usr/share/$pkgname/yawns_manager.py"
 install -Dm644 "$program_dir/src/yawns_notifications.py" "/usr/share/$pkgname/yawns_notifications.py"
-install -Dm644 "$program_dir/src/gtk_helpers.py" "/usr/share/$pkgname/gtk_helpers.py"
+install -Dm644 "$program_dir/src/yawn_pool.py" "/usr/share/$pkgname/yawn_pool.py"
+install -Dm644 "$program_dir/src/frontend.py" "/usr/share/$pkgname/frontend.py"
+install -Dm644 "$program_dir/src/admission.py" "/usr/share/$pkgname/admission.py"
+install -Dm644 "$program_dir/src/animation_clock.py" "/usr/share/$pkgname/animation_clock.py"
+install -Dm644 "$program_dir/src/history.py" "/usr/share/$pkgname/history.py"
+install -Dm644 "$program_dir/src/hooks.py" "/usr/share/$pkgname/hooks.py"
+install -Dm644 "$program_dir/src/icon_helpers.py" "/usr/share/$pkgname/icon_helpers.py"
+install -Dm644 "$program_dir/src/image_helpers.py" "/usr/share/$pkgname/image_helpers.py"
+install -Dm644 "$program_dir/src/media_compositor.py" "/usr/share/$pkgname/media_compositor.py"
+install -Dm644 "$program_dir/src/overflow.py" "/usr/share/$pkgname/overflow.py"
+install -Dm644 "$program_dir/src/pixmap_cache.py" "/usr/share/$pkgname/pixmap_cache.py"
+install -Dm644 "$program_dir/src/registry.py" "/usr/share/$pkgname/registry.py"
+install -Dm644 "$program_dir/src/routing.py" "/usr/share/$pkgname/routing.py"
+install -Dm644 "$program_dir/src/settings.py" "/usr/share/$pkgname/settings.py"
+install -Dm644 "$program_dir/src/stack_layout.py" "/usr/share/$pkgname/stack_layout.py"
+install -Dm644 "$program_dir/src/style_metrics.py" "/usr/share/$pkgname/style_metrics.py"
 install -Dm644 "$program_dir/src/backends/X11.py" "/usr/share/$pkgname/backends/X11.py"
 
 # Install assets
@@ -23,6 +39,9 @@ install -Dm644 "$program_dir/assets/vinyl.png" "/usr/share/$pkgname/assets/vinyl
 install -Dm644 "$program_dir/src/style.qss" "/usr/share/$pkgname/style.qss"
 install -Dm644 "$program_dir/src/config.ini" "/usr/share/$pkgname/config.ini"
 
+# Let D-Bus start yawns on the first notification
+install -Dm644 "$program_dir/src/yawns.service" "/usr/share/dbus-1/services/$pkgname.service"
+
 # Create a wrapper script for first-run setup and execution
 install -Dm755 -d "$pkgdir/usr/bin"  # Ensure the directory exists for the wrapper script
 echo '#!/bin/bash
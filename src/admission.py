@@ -0,0 +1,157 @@
+import time
+
+ADMIT = "admit"
+MERGE = "merge"
+DROP = "drop"
+
+# Past this many tracked senders/notifications, stale entries get pruned
+MAX_TRACKED = 1024
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = now
+        self.dropping = False
+        self.dropped = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def take(self, now):
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AdmissionControl:
+    """
+    Decides whether an incoming notification gets a yawn of its own.
+
+    Every (sender, app_name) pair gets a token bucket, so a flooding
+    client can't starve the rest. Notifications identical to a live one
+    (same app_name, summary and body) received within the dedup window
+    are merged into it instead of opening a new yawn.
+
+    Defaults come from the [admission] section, and any app can override
+    them in an [admission:<app_name>] section.
+    """
+
+    def __init__(self, config=None):
+        self.config = config
+        self.buckets = {}
+        self.recent = {}
+        self.recent_by_id = {}
+        self.admitted = 0
+        self.merged = 0
+        self.dropped = 0
+        self.limits_cache = {}
+
+    def limits_for(self, app_name):
+        """
+        Returns (rate, burst, dedup window in seconds) for an app.
+        """
+        if app_name in self.limits_cache:
+            return self.limits_cache[app_name]
+
+        def get(option, fallback):
+            value = fallback
+            for section in ["admission", f"admission:{app_name}"]:
+                if self.config and self.config.has_option(section, option):
+                    value = self.config.getfloat(section, option)
+            return value
+
+        limits = (
+            get("rate", 10),
+            get("burst", 20),
+            get("dedup-window", 2000) / 1000,
+        )
+        self.limits_cache[app_name] = limits
+        return limits
+
+    def check(self, sender, app_name, summary, body, urgency=1):
+        """
+        Returns (decision, notification_id, count). notification_id and
+        count are those of the live notification when merging.
+        """
+        now = time.monotonic()
+        rate, burst, dedup_window = self.limits_for(app_name)
+
+        key = (app_name, summary, body)
+        entry = self.recent.get(key, None)
+        if entry and dedup_window > 0 and now - entry[1] <= dedup_window:
+            entry[1] = now
+            entry[2] += 1
+            self.merged += 1
+            return MERGE, entry[0], entry[2]
+
+        # Critical notifications are never rate limited
+        if rate > 0 and urgency < 2:
+            bucket = self.buckets.get((sender, app_name), None)
+            if bucket is None:
+                if len(self.buckets) >= MAX_TRACKED:
+                    self.prune_buckets(now)
+                bucket = TokenBucket(rate, burst, now)
+                self.buckets[(sender, app_name)] = bucket
+            if not bucket.take(now):
+                self.dropped += 1
+                bucket.dropped += 1
+                if not bucket.dropping:
+                    bucket.dropping = True
+                    print(f"Rate limiting notifications from {app_name} ({sender})")
+                return DROP, 0, 0
+            if bucket.dropping:
+                bucket.dropping = False
+                print(
+                    f"Stopped rate limiting notifications from {app_name} ({sender}), {bucket.dropped} dropped so far"
+                )
+
+        self.admitted += 1
+        return ADMIT, 0, 0
+
+    def register(self, notification_id, app_name, summary, body):
+        """
+        Remember an admitted notification so duplicates can be merged into it
+        """
+        if len(self.recent) >= MAX_TRACKED:
+            self.prune_recent(time.monotonic())
+        key = (app_name, summary, body)
+        old = self.recent.get(key, None)
+        if old:
+            self.recent_by_id.pop(old[0], None)
+        self.recent[key] = [notification_id, time.monotonic(), 1]
+        self.recent_by_id[notification_id] = key
+
+    def forget(self, notification_id):
+        """
+        Called once a notification is closed, duplicates of it get a new yawn
+        """
+        key = self.recent_by_id.pop(notification_id, None)
+        if key is not None:
+            self.recent.pop(key, None)
+
+    def prune_buckets(self, now):
+        for key in list(self.buckets):
+            bucket = self.buckets[key]
+            bucket.refill(now)
+            if bucket.tokens >= bucket.burst:
+                del self.buckets[key]
+
+    def prune_recent(self, now):
+        for key in list(self.recent):
+            notification_id, last_seen, _ = self.recent[key]
+            if now - last_seen > self.limits_for(key[0])[2]:
+                del self.recent[key]
+                self.recent_by_id.pop(notification_id, None)
+
+    def stats(self):
+        return {
+            "notifications_admitted": self.admitted,
+            "notifications_merged": self.merged,
+            "notifications_dropped": self.dropped,
+        }
@@ -0,0 +1,73 @@
+from PyQt5.QtCore import QEvent, QObject, QTimer, Qt
+
+
+class AnimationClock(QObject):
+    """
+    One frame timer for every animated yawn.
+
+    Yawns register a callback to be run each frame, all on the same
+    cadence. The timer only runs while at least one registered yawn is
+    mapped: it watches their show and hide events, so hiding everything
+    (closing it, or a fullscreen window coming up) stops it entirely
+    and showing one starts it again.
+    """
+
+    def __init__(self, fps=30):
+        super().__init__()
+        self.animations = {}
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.ticks = 0
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        self.timer.setInterval(round(1000 / max(1, fps)))
+
+    def register(self, widget, callback):
+        """
+        Run callback every frame while widget is visible
+        """
+        if widget not in self.animations:
+            widget.installEventFilter(self)
+        self.animations[widget] = callback
+        self.update()
+
+    def unregister(self, widget):
+        if self.animations.pop(widget, None) is not None:
+            widget.removeEventFilter(self)
+            self.update()
+
+    def eventFilter(self, watched, event):
+        if event.type() in (QEvent.Show, QEvent.Hide):
+            # Visibility may not have flipped yet while the event is sent
+            QTimer.singleShot(0, self.update)
+        return False
+
+    def update(self):
+        """
+        Start or stop ticking depending on whether anything animated
+        is on screen
+        """
+        visible = any(widget.isVisible() for widget in self.animations)
+        if visible and not self.timer.isActive():
+            self.timer.start()
+        elif not visible and self.timer.isActive():
+            self.timer.stop()
+
+    def tick(self):
+        self.ticks += 1
+        visible = False
+        for widget, callback in list(self.animations.items()):
+            if widget.isVisible():
+                visible = True
+                callback()
+        if not visible:
+            self.timer.stop()
+
+    def stats(self):
+        return {
+            "animations": len(self.animations),
+            "animation_running": int(self.timer.isActive()),
+            "animation_ticks": self.ticks,
+        }
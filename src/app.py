@@ -1,22 +1,13 @@
 import sys
-import configparser
+import time
+
+# Measured from as early as possible, see --startup-timings
+STARTUP_TIME = time.monotonic()
+
 import signal
 import os
-import subprocess
-import fnmatch
 import argparse
 import asyncio
-import setproctitle
-from pathlib import Path
-
-from PyQt5.QtCore import QThread, pyqtSignal, QTimer, Qt
-from PyQt5.QtWidgets import QApplication
-from dbus_next.constants import MessageType
-from dbus_next.aio import MessageBus
-from dbus_next.message import Message
-
-from yawns_notifications import BaseYawn, YawnType, CornerYawn, CenterYawn, MediaYawn
-from yawns_manager import NotificationManager
 
 VERSION = "yawns v1.2.2"
 
@@ -32,270 +23,6 @@ def detect_compositor():
     return None
 
 
-class NotificationManagerThread(QThread):
-    notification_received = pyqtSignal(dict)
-    notification_closed = pyqtSignal(int)
-
-    def __init__(self):
-        super().__init__()
-        self.loop = asyncio.new_event_loop()
-        self.manager = None
-        self.bus = None
-
-    async def setup_dbus(self):
-        """Set up the D-Bus manager and bind the signal."""
-        self.bus = await MessageBus().connect()
-        self.manager = NotificationManager(self.bus)
-        self.manager.notify_app = self.notify_app
-        self.manager.close_notification = self.close_notification
-        self.manager.do_action_on_notification = self.do_action_on_notification
-        self.bus.export("/org/freedesktop/Notifications", self.manager)
-        await self.bus.request_name("org.freedesktop.Notifications")
-        print("Yawns manager running...")
-
-    def notify_app(self, info_dict: dict):
-        """Emit a PyQt signal when a notification is received."""
-        self.notification_received.emit(info_dict)
-
-    def close_notification(self, id, reason, sender_id):
-        """
-        Sends two signals, one (qt) to the yawns app to close the yawn with
-        the id provided and another one (dbus) to the sender app to tell it
-        the notification has been closed.
-        """
-        message = Message(
-            destination=sender_id,
-            message_type=MessageType.SIGNAL,  # Signal type
-            signature="uu",
-            interface="org.freedesktop.Notifications",
-            path="/org/freedesktop/Notifications",
-            member="NotificationClosed",
-            body=[int(id), int(reason)],
-        )
-        self.bus.send(message)
-        self.notification_closed.emit(id)
-
-    def do_action_on_notification(self, id, action, sender_id):
-        """
-        Performs an action on notification
-        The handling of the action depends on the sender app
-        """
-        message = Message(
-            destination=sender_id,
-            message_type=MessageType.SIGNAL,  # Signal type
-            signature="us",
-            interface="org.freedesktop.Notifications",
-            path="/org/freedesktop/Notifications",
-            member="ActionInvoked",
-            body=[id, action],
-        )
-        self.bus.send(message)
-
-    def run(self):
-        """Run the D-Bus manager in its own thread."""
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_until_complete(self.setup_dbus())
-        try:
-            self.loop.run_forever()
-        finally:
-            self.loop.close()
-
-    def stop(self):
-        """Stop the event loop and thread."""
-        self.loop.call_soon_threadsafe(self.loop.stop)
-        self.quit()
-
-
-class YawnsApp(QApplication):
-    request_notification_closing = pyqtSignal(int, int, str)
-    request_notification_action = pyqtSignal(int, str, str)
-
-    def __init__(self, appname, display_info, config, style_path):
-        self.setAttribute(Qt.AA_X11InitThreads)
-        super().__init__(appname)
-        self.display_info = display_info
-        self.config = config
-
-        # Load stylesheet
-        try:
-            self.stylesheet = Path(style_path).read_text()
-            self.setStyleSheet(self.stylesheet)
-        except Exception as e:
-            print(f"Error reading stylesheet: {e}")
-            self.stylesheet = ""
-
-        # Arrays for storing yawns
-        self.yawn_arrays = {
-            "CornerYawn": [],
-            "CenterYawn": [],
-            "MediaYawn": [],
-        }
-        self.fullscreen_detected = False
-
-    def handle_fullscreen_change(self, fullscreen):
-        """
-        Hide and show yawns depending on urgency and fullscreen state
-        """
-        self.fullscreen_detected = fullscreen
-        min_corner_urgency = self.config.getint("corner", "min_urgency", fallback=2)
-        min_center_urgency = self.config.getint("center", "min_urgency", fallback=2)
-        min_media_urgency = self.config.getint("media", "min_urgency", fallback=2)
-
-        def check_and_toggle(yawn_list, min_urgency):
-            for yawn in yawn_list:
-                should_hide = yawn.urgency < min_urgency and fullscreen
-                
-                if should_hide:
-                    yawn.hide()
-                    for clone in yawn.clones:
-                        clone.hide()
-                else:
-                    yawn.show()
-                    yawn.update_position()
-                    for clone in yawn.clones:
-                        clone.show()
-                        clone.update_position()
-
-        check_and_toggle(self.yawn_arrays["CornerYawn"], min_corner_urgency)
-        check_and_toggle(self.yawn_arrays["CenterYawn"], min_center_urgency)
-        check_and_toggle(self.yawn_arrays["MediaYawn"], min_media_urgency)
-
-    def select_yawn_type(self, info_dict):
-        """
-        Select the yawn type based on the yawn_type hint in info dict
-        """
-        fallback = self.show_corner_yawn
-        yawn_type = None
-
-        if "yawn_type" in info_dict["hints"]:
-            yawn_type = int(info_dict["hints"]["yawn_type"].value)
-
-        # Modify yawn_type according to filters in config
-        for yawn_type_value, section in enumerate(["corner", "center", "media"]):
-            for section_filter in ["app_name", "summary", "body"]:
-                filter_values = self.config.get(section, section_filter, fallback=None)
-                if not filter_values:
-                    continue
-                filter_values = filter_values.split()
-                for filter_value in filter_values:
-                    notif_value = info_dict.get(section_filter, None)
-                    if not notif_value:
-                        break
-                    if fnmatch.fnmatch(notif_value, filter_value):
-                        yawn_type = yawn_type_value + 1
-                        break
-
-        if yawn_type == YawnType.CORNER.value:
-            self.show_corner_yawn(info_dict)
-        elif yawn_type == YawnType.CENTER.value:
-            self.show_center_yawn(info_dict)
-        elif yawn_type == YawnType.MEDIA.value:
-            self.show_media_yawn(info_dict)
-        else:
-            fallback(info_dict)
-
-        # Run command after showing the yawn
-        if "general" in self.config.sections() and "command" in self.config["general"]:
-            command = os.path.expanduser(self.config["general"]["command"])
-            urgency_struct = info_dict["hints"].get("urgency", None)
-            urgency = 1
-            if urgency_struct:
-                urgency = int(urgency_struct.value)
-            try:
-                subprocess.call(
-                    [
-                        command,
-                        info_dict["app_name"],
-                        info_dict["summary"],
-                        info_dict["body"],
-                        info_dict["app_icon"],
-                        str(urgency),
-                    ]
-                )
-            except Exception as e:
-                print("Error running command:", command)
-                print(e)
-
-    def _handle_replace(self, info_dict, target_type, other_types):
-        """
-        Handles notification replacement logic.
-        Returns True if the notification was handled (replaced or updated),
-        False if a new notification needs to be created.
-        """
-        if info_dict["replaces_id"] == 0:
-            return False
-
-        # Close matching notifications in other yawn types
-        for type_name in other_types:
-            # Iterate over copy since we might modify list
-            for notif in self.yawn_arrays[type_name][:]:
-                if notif.info_dict["replaces_id"] == info_dict["replaces_id"]:
-                    notif.info_dict = info_dict
-                    notif.close()
-
-        # Update in-place if same type
-        for notif in self.yawn_arrays[target_type]:
-            if notif.info_dict["replaces_id"] == info_dict["replaces_id"]:
-                notif.info_dict = info_dict
-                notif.update_content()
-                return True
-
-        return False
-
-    def show_corner_yawn(self, info_dict):
-        if self._handle_replace(
-            info_dict, "CornerYawn", ["CenterYawn", "MediaYawn"]
-        ):
-            return
-
-        yawn = CornerYawn(self, self.config, info_dict)
-        min_urgency = self.config.getint("corner", "min_urgency", fallback=0)
-        
-        should_hide = yawn.urgency < min_urgency and self.fullscreen_detected
-        if not should_hide:
-            yawn.show()
-
-    def show_center_yawn(self, info_dict):
-        if self._handle_replace(
-            info_dict, "CenterYawn", ["CornerYawn", "MediaYawn"]
-        ):
-            return
-
-        yawn = CenterYawn(self, self.config, info_dict)
-        min_urgency = self.config.getint("center", "min_urgency", fallback=0)
-        
-        should_hide = yawn.urgency < min_urgency and self.fullscreen_detected
-        if not should_hide:
-            yawn.show()
-
-    def show_media_yawn(self, info_dict):
-        # Media yawn is unique: it acts as a singleton, replacing the existing one
-        # regardless of ID if one exists, OR it respects the standard replace ID logic.
-        # The original code just checked if *any* MediaYawn existed.
-        if self.yawn_arrays["MediaYawn"]:
-            notification = self.yawn_arrays["MediaYawn"][0]
-            notification.info_dict = info_dict
-            notification.update_content()
-            return
-
-        yawn = MediaYawn(self, self.config, info_dict)
-        min_urgency = self.config.getint("media", "min_urgency", fallback=0)
-        
-        should_hide = yawn.urgency < min_urgency and self.fullscreen_detected
-        if not should_hide:
-            yawn.show()
-
-    def close_notification(self, notification_id):
-        """
-        Close the notification with the given ID
-        """
-        for key in self.yawn_arrays:
-            for notification in self.yawn_arrays[key]:
-                if notification.info_dict["notification_id"] == notification_id:
-                    notification.close()
-                    return
-
-
 def handle_sigint(manager_thread, app):
     """Handle Ctrl+C to gracefully exit."""
     print("\nCtrl+C pressed. Exiting...")
@@ -305,36 +32,6 @@ def handle_sigint(manager_thread, app):
         app.quit()
 
 
-def check_notification_service():
-    """
-    Check if there's already a notification service running
-    """
-
-    async def async_check():
-        bus = await MessageBus().connect()
-        message = Message(
-            destination="org.freedesktop.DBus",
-            path="/org/freedesktop/DBus",
-            interface="org.freedesktop.DBus",
-            member="GetNameOwner",
-            signature="s",
-            body=["org.freedesktop.Notifications"],
-        )
-
-        reply = await bus.call(message)
-
-        if reply.message_type == MessageType.ERROR:
-            if "org.freedesktop.DBus.Error.NameHasNoOwner" in reply.error_name:
-                return False  # Name is not taken
-            else:
-                print(f"An unexpected error occurred: {reply.error_name}")
-                sys.exit(1)
-        else:
-            return True  # Name is taken
-
-    return asyncio.run(async_check())
-
-
 def parse_args():
     argparser = argparse.ArgumentParser(
         prog="yawns", description="Your Adaptable Widget Notification System"
@@ -345,6 +42,24 @@ def parse_args():
     argparser.add_argument(
         "-s", "--style", type=str, default=None, help="Path to the style.qss file"
     )
+    argparser.add_argument(
+        "--gui",
+        action="store_true",
+        help="Show the notifications of a running front end (frontend.py) instead of owning the notification service",
+    )
+    argparser.add_argument(
+        "--socket", type=str, default=None, help="Path of the front end socket, with --gui"
+    )
+    argparser.add_argument(
+        "--activated",
+        action="store_true",
+        help="Started through D-Bus activation, exit once idle ([general] idle-exit, 300 seconds by default)",
+    )
+    argparser.add_argument(
+        "--startup-timings",
+        action="store_true",
+        help="Print how long it took to own the notification service and to show the first yawn",
+    )
     argparser.add_argument("-v", "--version", action="version", version=VERSION)
     return argparser.parse_args()
 
@@ -360,14 +75,18 @@ def load_config(args):
     if not os.path.isfile(style_path):
         print(f"Warning: Style file '{style_path}' does not exist.")
 
-    config = configparser.ConfigParser()
-    config.read(config_path)
-    return config, style_path
+    from settings import load_settings
+
+    return load_settings(config_path), style_path
 
 
 def detect_display_server():
+    """
+    Returns the display server name and, for Xorg, an open Xlib display
+    """
     server = None
     compositor = None
+    display = None
     if "WAYLAND_DISPLAY" in os.environ:
         server = "Wayland"
         compositor = detect_compositor()
@@ -383,30 +102,85 @@ def detect_display_server():
         sys.exit(1)
 
     elif "DISPLAY" in os.environ:
+        # Opening the display is all xdpyinfo would check,
+        # and the connection gets reused by the X11 backend
         try:
-            result = subprocess.run(
-                ["xdpyinfo"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            if result.returncode == 0:
-                server = "Xorg"
-        except FileNotFoundError:
-            pass
+            # The X11 backend uses the display from several threads, it
+            # has to be threaded before the connection's lock is made
+            import Xlib.threaded
+            from Xlib.display import Display
+
+            display = Display()
+            server = "Xorg"
+        except Exception as e:
+            print(f"Error connecting to the X server: {e}")
 
     if not server:
         print("Unable to detect the display server (Xorg or Wayland). Exiting...")
         sys.exit(1)
 
-    return server
+    return server, display
 
 
-if __name__ == "__main__":
-    if check_notification_service():
+class StartupTimings:
+    """
+    Prints how long startup milestones took, counted from STARTUP_TIME
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+
+    def mark(self, milestone):
+        if self.enabled:
+            elapsed = (time.monotonic() - STARTUP_TIME) * 1000
+            print(f"Startup: {milestone} after {elapsed:.1f} ms")
+
+
+def start_service(config, timings, loop=None):
+    """
+    Take the notification service name with a single bus connection,
+    on loop or a new one. Exits if another service already owns it.
+    """
+    from yawns_manager import acquire_service
+
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    bus, manager = loop.run_until_complete(acquire_service(config))
+    if bus is None:
         print("A notification service is already running. Exiting...")
         sys.exit(1)
+    timings.mark("name acquired")
+    print("Yawns manager running...")
+    return loop, bus, manager
 
+
+if __name__ == "__main__":
     args = parse_args()
-    config, style_path = load_config(args)
-    server_type = detect_display_server()
+    timings = StartupTimings(args.startup_timings)
+    settings, style_path = load_config(args)
+    config = settings.parser
+    server_type, display = detect_display_server()
+
+    # Own the notification service before loading anything heavy.
+    # An integrated loop needs the Qt app, so it has to wait for it
+    integrated = (
+        not args.gui
+        and config.get("general", "event-loop", fallback="thread") == "integrated"
+    )
+    service_args = None
+    if not args.gui and not integrated:
+        service_args = start_service(config, timings)
+
+    from PyQt5.QtCore import QTimer
+    from yawns_app import (
+        YawnsApp,
+        NotificationService,
+        NotificationManagerThread,
+        RemoteNotificationService,
+        connect_service,
+        create_integrated_loop,
+    )
 
     # Initialize app
     fullscreen_monitor_thread = None
@@ -414,13 +188,11 @@ if __name__ == "__main__":
 
     if server_type == "Xorg":
         from backends.X11 import FullscreenMonitor, setup_yawn_window
-        from Xlib.display import Display
 
-        display = Display()
         app = YawnsApp(
             ["yawns"],
             {"display_server": "Xorg", "X11_display": display},
-            config,
+            settings,
             style_path,
         )
         app.setup_yawn_window = setup_yawn_window
@@ -433,14 +205,58 @@ if __name__ == "__main__":
         sys.exit(1)
 
     app.setQuitOnLastWindowClosed(False)
+    timings.mark("GUI ready")
+
+    def first_yawn_mapped():
+        timings.mark("first yawn mapped")
+        app.yawns_mapped.disconnect(first_yawn_mapped)
+
+    app.yawns_mapped.connect(first_yawn_mapped)
+
+    # Run the D-Bus service either on the Qt event loop
+    # or on its own loop in a separate thread, unless
+    # a front end process owns it
+    loop = None
+    if integrated:
+        loop = create_integrated_loop(app)
+        if loop:
+            service_args = start_service(config, timings, loop)
+        else:
+            service_args = start_service(config, timings)
+
+    manager_thread = None
+    if args.gui:
+        from frontend import default_socket_path
 
-    # Start Manager Thread
-    manager_thread = NotificationManagerThread()
-    manager_thread.notification_received.connect(app.select_yawn_type)
-    app.request_notification_closing.connect(manager_thread.close_notification)
-    app.request_notification_action.connect(manager_thread.do_action_on_notification)
-    manager_thread.notification_closed.connect(app.close_notification)
-    manager_thread.start()
+        service = RemoteNotificationService(args.socket or default_socket_path())
+        connect_service(service, app)
+        service.connect_frontend()
+    else:
+        service = NotificationService(*service_args)
+        connect_service(service, app)
+        if not loop:
+            manager_thread = NotificationManagerThread(service)
+            manager_thread.start()
+
+        # Give the name back and exit when there's nothing to show
+        idle_exit = config.getint(
+            "general", "idle-exit", fallback=300 if args.activated else 0
+        )
+        if idle_exit > 0:
+
+            def exit_when_idle():
+                print(f"No yawns for {idle_exit} seconds. Exiting...")
+                service.release_name()
+
+            service.name_released.connect(app.quit)
+            app.idle.connect(exit_when_idle)
+            app.set_idle_exit(idle_exit)
+
+    # Reload the config and stylesheet on SIGHUP or when their file changes
+    signal.signal(
+        signal.SIGHUP, lambda *_: (app.reload_settings(), app.reload_stylesheet())
+    )
+    app.watch_config()
 
     # Handle Ctrl+C
     signal.signal(signal.SIGINT, lambda *_: handle_sigint(manager_thread, app))
@@ -449,6 +265,13 @@ if __name__ == "__main__":
     timer.start(100)
 
     try:
+        if loop:
+            with loop:
+                loop.run_forever()
+            sys.exit(0)
         sys.exit(app.exec_())
     finally:
-        manager_thread.stop()
+        if manager_thread:
+            manager_thread.stop()
+        else:
+            service.stop()
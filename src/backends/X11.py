@@ -63,13 +63,9 @@ class FullscreenMonitor(QThread):
 
 def setup_yawn_window(yawn: BaseYawn):
     """
-    Set up X11 properties for a yawn.
+    Set up X11 properties for a yawn. Called again when a pooled
+    yawn is reused for a notification with a different urgency.
     """
-    urgency_struct = yawn.info_dict["hints"].get("urgency", None)
-    yawn.urgency = 1
-    if urgency_struct:
-        yawn.urgency = int(urgency_struct.value)
-
     if QX11Info.isPlatformX11():
         # Use the previously open X display connection
         x11_display = yawn.app.display_info["X11_display"]
@@ -0,0 +1,417 @@
+import os
+import sys
+import json
+import mmap
+import errno
+import signal
+import socket
+import asyncio
+import argparse
+import configparser
+from dbus_next.constants import MessageType
+from dbus_next.message import Message
+from dbus_next.signature import Variant
+
+from yawns_manager import acquire_service
+
+# Largest packet exchanged with the GUI, image data travels in memfds
+MAX_PACKET = 256 * 1024
+# Messages bigger than this (huge bodies, long action lists) are sent
+# in a memfd too, the socket's send buffer may not fit them
+MAX_INLINE = 64 * 1024
+# Live notifications kept around to be resent to a restarted GUI
+MAX_LIVE = 256
+# Hints with these types are forwarded to the GUI, the rest (mostly
+# raw image data, which gets its own memfd) is dropped
+FORWARDED_SIGNATURES = set("sbynqiuxtd")
+RECORD_FIELDS = (
+    "app_name",
+    "replaces_id",
+    "notification_id",
+    "app_icon",
+    "summary",
+    "body",
+    "actions",
+    "expire_timeout",
+    "sender_id",
+    "img_key",
+    "image_pending",
+)
+
+
+def default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/yawns-{os.getuid()}"
+    return os.path.join(runtime_dir, "yawns.sock")
+
+
+def buffer_to_memfd(data):
+    """
+    Copy data into an anonymous memory file the GUI can map
+    """
+    fd = os.memfd_create("yawns-image", os.MFD_CLOEXEC)
+    with open(fd, "wb", closefd=False) as memfd:
+        memfd.write(data)
+    return fd
+
+
+def map_memfd(fd, size):
+    """
+    Map a memfd received from the front end read only. The fd itself
+    is closed, the mapping stays valid until it's garbage collected.
+    """
+    try:
+        return mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ)
+    finally:
+        os.close(fd)
+
+
+def encode_notification(info_dict):
+    """
+    Turn an info_dict into a JSON friendly record.
+    Returns the record and the image data to hand over in a memfd.
+    """
+    record = {key: info_dict[key] for key in RECORD_FIELDS}
+    record["repeat_count"] = info_dict.get("repeat_count", 1)
+    record["hints"] = {
+        name: [variant.signature, variant.value]
+        for name, variant in info_dict["hints"].items()
+        if variant.signature in FORWARDED_SIGNATURES
+    }
+    record["img_raw"] = None
+    data = None
+    if info_dict["img_raw"]:
+        record["img_raw"] = dict(info_dict["img_raw"])
+        data = record["img_raw"].pop("buffer")
+    elif info_dict["img_byte_arr"]:
+        data = info_dict["img_byte_arr"]
+    record["img_size"] = len(data) if data else 0
+    return record, data
+
+
+def decode_notification(record, fds):
+    """
+    Rebuild the info_dict sent by the front end. Raw pixels are used
+    straight from the shared mapping.
+    """
+    info_dict = dict(record)
+    info_dict["hints"] = {
+        name: Variant(signature, value)
+        for name, (signature, value) in record["hints"].items()
+    }
+    info_dict["img_byte_arr"] = None
+    mapping = None
+    if fds and record["img_size"]:
+        mapping = map_memfd(fds[0], record["img_size"])
+    if record["img_raw"]:
+        info_dict["img_raw"] = dict(record["img_raw"], buffer=mapping) if mapping else None
+    elif mapping:
+        info_dict["img_byte_arr"] = bytes(mapping)
+    return info_dict
+
+
+def encode_packet(message, fds=()):
+    """
+    Returns the data and fds to send for message. A message too big to
+    go inline is moved to a memfd appended to fds, which the caller
+    has to close once it's sent.
+    """
+    data = json.dumps(message).encode()
+    if len(data) <= MAX_INLINE:
+        return data, list(fds)
+    packed = json.dumps({"op": "packed", "size": len(data)}).encode()
+    return packed, list(fds) + [buffer_to_memfd(data)]
+
+
+def send_packet(sock, message, fds=()):
+    data, packet_fds = encode_packet(message, fds)
+    try:
+        socket.send_fds(sock, [data], packet_fds)
+    finally:
+        for fd in packet_fds[len(fds):]:
+            os.close(fd)
+
+
+def recv_packet(sock):
+    """
+    Returns the next (message, fds) from sock, message is None once
+    the other end hung up. Raises BlockingIOError when there's nothing
+    left to read.
+    """
+    data, fds, _, _ = socket.recv_fds(sock, MAX_PACKET, 2)
+    if not data:
+        for fd in fds:
+            os.close(fd)
+        return None, []
+    message = json.loads(data)
+    if message.get("op", None) == "packed":
+        message = json.loads(bytes(map_memfd(fds.pop(), message["size"])))
+    return message, fds
+
+
+class FrontEnd:
+    """
+    Owns org.freedesktop.Notifications without any Qt in the process,
+    so Notify replies never wait on painting or layout.
+
+    Notifications are forwarded to the GUI process (app.py --gui) over
+    a unix socket, with image data in memfds. Live notifications are
+    kept until closed, so a GUI that restarts gets them all back
+    without the bus name ever being dropped.
+    """
+
+    def __init__(self, config, socket_path):
+        self.config = config
+        self.socket_path = socket_path
+        self.loop = None
+        self.bus = None
+        self.manager = None
+        self.server = None
+        self.gui = None
+        self.outgoing = []
+        # id -> [record, memfd or None]
+        self.live = {}
+        self.gui_stats = {}
+
+    async def setup_dbus(self):
+        self.bus, self.manager = await acquire_service(self.config)
+        if self.bus is None:
+            print("A notification service is already running. Exiting...")
+            sys.exit(1)
+        self.manager.notify_app = self.notify_app
+        self.manager.image_loaded = self.image_loaded
+        self.manager.notify_repeated = self.notify_repeated
+        self.manager.app_stats = self.app_stats
+        self.manager.close_notification = self.close_notification
+        self.manager.do_action_on_notification = self.do_action_on_notification
+        print("Yawns front end running...")
+
+    def listen(self):
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self.server = socket.socket(
+            socket.AF_UNIX, socket.SOCK_SEQPACKET | socket.SOCK_CLOEXEC
+        )
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(1)
+        self.server.setblocking(False)
+        self.loop.add_reader(self.server, self.accept_gui)
+
+    def accept_gui(self):
+        try:
+            gui, _ = self.server.accept()
+        except BlockingIOError:
+            return
+        # The newest GUI wins, an old one is most likely stuck
+        if self.gui:
+            self.drop_gui()
+        gui.setblocking(False)
+        self.gui = gui
+        self.loop.add_reader(gui, self.read_gui)
+        print("GUI connected")
+        for id in list(self.live):
+            self.send_live(id)
+
+    def drop_gui(self):
+        self.loop.remove_reader(self.gui)
+        self.loop.remove_writer(self.gui)
+        self.gui.close()
+        self.gui = None
+        for _, fds in self.outgoing:
+            for fd in fds:
+                os.close(fd)
+        self.outgoing = []
+
+    def send(self, message, fds=()):
+        """
+        Queue a message for the GUI. The fds are duplicated, so they
+        can be closed right away.
+        """
+        if not self.gui:
+            return
+        self.outgoing.append(encode_packet(message, [os.dup(fd) for fd in fds]))
+        if len(self.outgoing) == 1:
+            self.flush()
+
+    def flush(self):
+        while self.outgoing:
+            data, fds = self.outgoing[0]
+            try:
+                socket.send_fds(self.gui, [data], fds)
+            except BlockingIOError:
+                self.loop.add_writer(self.gui, self.flush)
+                return
+            except OSError as e:
+                if e.errno == errno.EMSGSIZE:
+                    # Only this message is lost, dropping the GUI would
+                    # just replay it again once it reconnects
+                    print(f"Message too big for the GUI, skipping it: {e}")
+                    self.outgoing.pop(0)
+                    for fd in fds:
+                        os.close(fd)
+                    continue
+                print(f"Error sending to the GUI: {e}")
+                self.drop_gui()
+                return
+            self.outgoing.pop(0)
+            for fd in fds:
+                os.close(fd)
+        self.loop.remove_writer(self.gui)
+
+    def read_gui(self):
+        while self.gui:
+            try:
+                message, fds = recv_packet(self.gui)
+            except BlockingIOError:
+                return
+            except (OSError, ValueError) as e:
+                print(f"Error reading from the GUI: {e}")
+                self.drop_gui()
+                return
+            for fd in fds:
+                os.close(fd)
+            if message is None:
+                print("GUI disconnected")
+                self.drop_gui()
+                return
+
+            op = message.get("op", None)
+            if op == "close":
+                self.close_notification(
+                    message["id"], message["reason"], message["sender"]
+                )
+            elif op == "action":
+                self.do_action_on_notification(
+                    message["id"], message["action"], message["sender"]
+                )
+            elif op == "stats":
+                self.gui_stats = message["stats"]
+
+    def send_live(self, id):
+        record, fd = self.live[id]
+        self.send({"op": "notify", "info": record}, [] if fd is None else [fd])
+
+    def forget_live(self, id):
+        entry = self.live.pop(id, None)
+        if entry and entry[1] is not None:
+            os.close(entry[1])
+
+    def notify_app(self, info_dict):
+        record, data = encode_notification(info_dict)
+        # A replacement keeps the id, the GUI updates the yawn in place
+        id = record["notification_id"]
+        self.forget_live(id)
+        while len(self.live) >= MAX_LIVE:
+            self.forget_live(next(iter(self.live)))
+        self.live[id] = [record, buffer_to_memfd(data) if data else None]
+        self.send_live(id)
+
+    def image_loaded(self, id, img_byte_arr, img_key):
+        entry = self.live.get(id, None)
+        if entry is None:
+            return
+        record = entry[0]
+        record["image_pending"] = False
+        record["img_key"] = img_key
+        record["img_raw"] = None
+        record["img_size"] = len(img_byte_arr) if img_byte_arr else 0
+        if entry[1] is not None:
+            os.close(entry[1])
+        entry[1] = buffer_to_memfd(img_byte_arr) if img_byte_arr else None
+        self.send(
+            {"op": "image", "id": id, "key": img_key, "size": record["img_size"]},
+            [] if entry[1] is None else [entry[1]],
+        )
+
+    def notify_repeated(self, id, count):
+        if id in self.live:
+            self.live[id][0]["repeat_count"] = count
+        self.send({"op": "repeat", "id": id, "count": count})
+
+    def app_stats(self):
+        """
+        GUI stats can't be fetched synchronously, this returns the last
+        ones reported and asks for fresh ones.
+        """
+        self.send({"op": "stats"})
+        return self.gui_stats
+
+    def close_notification(self, id, reason, sender_id):
+        message = Message(
+            destination=sender_id,
+            message_type=MessageType.SIGNAL,
+            signature="uu",
+            interface="org.freedesktop.Notifications",
+            path="/org/freedesktop/Notifications",
+            member="NotificationClosed",
+            body=[int(id), int(reason)],
+        )
+        self.bus.send(message)
+        self.manager.forget_notification(int(id))
+        self.forget_live(int(id))
+        self.send({"op": "closed", "id": int(id)})
+
+    def do_action_on_notification(self, id, action, sender_id):
+        message = Message(
+            destination=sender_id,
+            message_type=MessageType.SIGNAL,
+            signature="us",
+            interface="org.freedesktop.Notifications",
+            path="/org/freedesktop/Notifications",
+            member="ActionInvoked",
+            body=[id, action],
+        )
+        self.bus.send(message)
+
+    def stop(self):
+        if self.manager:
+            self.manager.image_decoder.shutdown()
+        if self.server:
+            self.server.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+def parse_args():
+    argparser = argparse.ArgumentParser(
+        prog="yawns-frontend",
+        description="Owns the notification service and hands notifications to a yawns GUI (app.py --gui)",
+    )
+    argparser.add_argument(
+        "-c", "--config", type=str, default=None, help="Path to the config.ini file"
+    )
+    argparser.add_argument(
+        "--socket", type=str, default=None, help="Path of the socket the GUI connects to"
+    )
+    return argparser.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        import setproctitle
+        setproctitle.setproctitle("yawns-frontend")
+    except ImportError:
+        pass
+
+    args = parse_args()
+    config = configparser.ConfigParser()
+    config.read(args.config or os.path.expanduser("~/.config/yawns/config.ini"))
+
+    frontend = FrontEnd(config, args.socket or default_socket_path())
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    frontend.loop = loop
+    loop.run_until_complete(frontend.setup_dbus())
+    frontend.listen()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, loop.stop)
+
+    try:
+        loop.run_forever()
+    finally:
+        frontend.stop()
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+from itertools import islice
+
+
+def default_history_path():
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(data_home, "yawns", "history.jsonl")
+
+
+class NotificationHistory:
+    """
+    Bounded history of recent notifications.
+
+    The newest max_entries records are kept in memory (in time order,
+    plus a per app index) and mirrored to an append-only JSON lines log.
+    All file writes happen on a background thread, so recording a
+    notification never blocks on disk. Once the log holds twice as many
+    lines as entries kept, it gets compacted down to the live records.
+
+    Replacements update the record of the notification they replace
+    and move it to the newest end. Every record has a "uid" unique
+    across runs (notification ids start over every run), which is what
+    the log is keyed by.
+    """
+
+    def __init__(self, path=None, max_entries=200):
+        self.path = path or default_history_path()
+        self.max_entries = max_entries
+        self.entries = deque()
+        self.by_app = {}
+        # Only this run's records, by notification id
+        self.by_id = {}
+        self.next_uid = 1
+        self.log_lines = 0
+        self.writes = queue.SimpleQueue()
+        self.load()
+        self.writer = threading.Thread(
+            target=self.write_loop, name="yawns-history", daemon=True
+        )
+        self.writer.start()
+
+    def load(self):
+        """
+        Read back the records kept by a previous run
+        """
+        records = {}
+        try:
+            with open(self.path) as log:
+                for line in log:
+                    self.log_lines += 1
+                    try:
+                        record = json.loads(line)
+                        # The last line for a record is where it belongs
+                        records.pop(record["uid"], None)
+                        records[record["uid"]] = record
+                        self.next_uid = max(self.next_uid, int(record["uid"]) + 1)
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Error reading notification history: {e}")
+            return
+
+        for record in list(records.values())[-self.max_entries :]:
+            self._append(record)
+        # Ids from an earlier run never get replaced
+        self.by_id.clear()
+
+    def _remove(self, record):
+        self.entries.remove(record)
+        app_entries = self.by_app[record["app_name"]]
+        app_entries.remove(record)
+        if not app_entries:
+            del self.by_app[record["app_name"]]
+        if self.by_id.get(record["id"], None) is record:
+            del self.by_id[record["id"]]
+
+    def _append(self, record):
+        if len(self.entries) >= self.max_entries:
+            evicted = self.entries.popleft()
+            app_entries = self.by_app[evicted["app_name"]]
+            app_entries.popleft()
+            if not app_entries:
+                del self.by_app[evicted["app_name"]]
+            # Ids restart every run, an old record's id may be taken
+            if self.by_id.get(evicted["id"], None) is evicted:
+                del self.by_id[evicted["id"]]
+        self.entries.append(record)
+        self.by_app.setdefault(record["app_name"], deque()).append(record)
+        self.by_id[record["id"]] = record
+
+    def add(self, info_dict):
+        """
+        Record a notification. Must only be called from the D-Bus loop.
+        """
+        urgency_struct = info_dict["hints"].get("urgency", None)
+        fields = {
+            "id": info_dict["notification_id"],
+            "app_name": info_dict["app_name"],
+            "summary": info_dict["summary"],
+            "body": info_dict["body"],
+            "app_icon": info_dict["app_icon"],
+            "urgency": int(urgency_struct.value) if urgency_struct else 1,
+            "time": time.time(),
+        }
+
+        record = self.by_id.get(info_dict["replaces_id"], None)
+        if record is not None and record["app_name"] == fields["app_name"]:
+            self._remove(record)
+            record.update(fields)
+        else:
+            record = dict(fields, uid=self.next_uid)
+            self.next_uid += 1
+        self._append(record)
+
+        self.writes.put(json.dumps(record) + "\n")
+        self.log_lines += 1
+        if self.log_lines > 2 * self.max_entries:
+            self.writes.put([json.dumps(r) + "\n" for r in self.entries])
+            self.log_lines = len(self.entries)
+
+    def query(self, offset, limit, app_filter=""):
+        """
+        Page through the history, newest first, optionally only for one app
+        """
+        if app_filter:
+            records = self.by_app.get(app_filter, ())
+        else:
+            records = self.entries
+        return list(islice(reversed(records), offset, offset + limit))
+
+    def write_loop(self):
+        """
+        Append queued lines to the log. A list instead of a line means
+        the log gets rewritten with only those lines.
+        """
+        pending = None
+        while True:
+            item = pending if pending is not None else self.writes.get()
+            pending = None
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if isinstance(item, list):
+                    tmp_path = f"{self.path}.tmp"
+                    with open(tmp_path, "w") as log:
+                        log.writelines(item)
+                    os.replace(tmp_path, self.path)
+                    continue
+
+                # Batch everything that queued up while writing
+                lines = [item]
+                while True:
+                    try:
+                        next_item = self.writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(next_item, list):
+                        pending = next_item
+                        break
+                    lines.append(next_item)
+                with open(self.path, "a") as log:
+                    log.writelines(lines)
+            except OSError as e:
+                print(f"Error writing notification history: {e}")
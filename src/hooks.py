@@ -0,0 +1,209 @@
+import os
+import json
+from collections import deque
+
+from PyQt5.QtCore import QObject, QProcess, QTimer
+
+# Don't respawn a persistent hook that keeps dying more than once a second
+RESTART_INTERVAL = 1000
+
+
+def hook_arguments(info_dict):
+    urgency_struct = info_dict["hints"].get("urgency", None)
+    return {
+        "app_name": info_dict["app_name"],
+        "summary": info_dict["summary"],
+        "body": info_dict["body"],
+        "app_icon": info_dict["app_icon"],
+        "urgency": int(urgency_struct.value) if urgency_struct else 1,
+    }
+
+
+class HookRunner(QObject):
+    """
+    Runs general.command for shown notifications without blocking the GUI.
+
+    In "exec" mode every notification starts the command with app name,
+    summary, body, icon and urgency as arguments. At most `workers` run
+    at once, the rest wait in a queue of up to `queue_depth` entries (new
+    ones are dropped past that), and a run taking longer than `timeout`
+    ms gets killed.
+
+    In "persistent" mode the command is started once and every
+    notification is written to its stdin as a JSON line. It's restarted
+    if it exits, and notifications are dropped while it's not keeping up.
+    """
+
+    def __init__(self, settings):
+        super().__init__()
+        self.settings = None
+        self.queue = deque()
+        self.running = set()
+        self.persistent = None
+        self.restart_timer = QTimer(self)
+        self.restart_timer.setSingleShot(True)
+        self.restart_timer.setInterval(RESTART_INTERVAL)
+        self.peak_queued = 0
+        self.started = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.dropped = 0
+        self.configure(settings)
+
+    def configure(self, settings):
+        """
+        Apply new [general] settings, a changed command or mode
+        restarts the persistent hook
+        """
+        old = self.settings
+        self.settings = settings
+        if old and (old.command, old.command_mode) == (
+            settings.command,
+            settings.command_mode,
+        ):
+            return
+        self.stop_persistent()
+        if settings.command_mode not in ("exec", "persistent"):
+            print(f"Unknown command-mode {settings.command_mode}, using exec")
+
+    @property
+    def command(self):
+        return os.path.expanduser(self.settings.command)
+
+    def run(self, info_dict):
+        if not self.settings.command:
+            return
+        arguments = hook_arguments(info_dict)
+        if self.settings.command_mode == "persistent":
+            self.write_persistent(arguments)
+            return
+
+        if len(self.queue) >= self.settings.command_queue_depth:
+            self.dropped += 1
+            return
+        self.queue.append(arguments)
+        self.peak_queued = max(self.peak_queued, len(self.queue))
+        self.start_next()
+
+    def start_next(self):
+        while self.queue and len(self.running) < max(1, self.settings.command_workers):
+            arguments = self.queue.popleft()
+            process = QProcess(self)
+            process.setProcessChannelMode(QProcess.ForwardedChannels)
+            process.setStandardInputFile(QProcess.nullDevice())
+            timer = QTimer(process)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda process=process: self.kill(process))
+            process.finished.connect(
+                lambda *_, process=process: self.finished(process)
+            )
+            process.errorOccurred.connect(
+                lambda error, process=process: self.error(process, error)
+            )
+            self.running.add(process)
+            self.started += 1
+            process.start(
+                self.command,
+                [
+                    arguments["app_name"],
+                    arguments["summary"],
+                    arguments["body"],
+                    arguments["app_icon"],
+                    str(arguments["urgency"]),
+                ],
+            )
+            if self.settings.command_timeout > 0:
+                timer.start(self.settings.command_timeout)
+
+    def kill(self, process):
+        print(f"Command timed out, killing it: {self.command}")
+        self.timed_out += 1
+        process.kill()
+
+    def error(self, process, error):
+        # Anything but a failed start still ends with finished
+        if error == QProcess.FailedToStart:
+            print(f"Error running command {self.command}: {process.errorString()}")
+            self.failed += 1
+            self.finished(process)
+
+    def finished(self, process):
+        if process not in self.running:
+            return
+        self.running.discard(process)
+        process.deleteLater()
+        self.start_next()
+
+    def write_persistent(self, arguments):
+        if self.persistent is None:
+            if self.restart_timer.isActive():
+                self.dropped += 1
+                return
+            self.start_persistent()
+            if self.persistent is None:
+                self.dropped += 1
+                return
+        # Don't let a stuck hook make us buffer without bound
+        if self.persistent.bytesToWrite() > self.settings.command_queue_depth * 4096:
+            self.dropped += 1
+            return
+        self.persistent.write(json.dumps(arguments).encode() + b"\n")
+
+    def start_persistent(self):
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ForwardedChannels)
+        process.finished.connect(lambda *_: self.persistent_exited(process))
+        process.errorOccurred.connect(
+            lambda error: self.persistent_exited(process)
+            if error == QProcess.FailedToStart
+            else None
+        )
+        self.persistent = process
+        self.started += 1
+        process.start(self.command, [])
+
+    def persistent_exited(self, process):
+        if process is not self.persistent:
+            return
+        print(f"Command exited: {self.command}")
+        self.failed += 1
+        self.persistent = None
+        process.deleteLater()
+        self.restart_timer.start()
+
+    def stop_persistent(self):
+        """
+        Ask the persistent hook to exit (stdin is closed as well),
+        killing it if it's still around a second later
+        """
+        process, self.persistent = self.persistent, None
+        if process is not None:
+            process.finished.connect(process.deleteLater)
+            process.closeWriteChannel()
+            process.terminate()
+            timer = QTimer(process)
+            timer.setSingleShot(True)
+            timer.timeout.connect(process.kill)
+            timer.start(RESTART_INTERVAL)
+
+    def stop(self):
+        self.queue.clear()
+        processes = list(self.running)
+        if self.persistent is not None:
+            processes.append(self.persistent)
+        self.persistent = None
+        for process in processes:
+            process.kill()
+            process.waitForFinished(100)
+
+    def stats(self):
+        return {
+            "command_queue_depth": len(self.queue),
+            "command_queue_peak": self.peak_queued,
+            "command_queue_max": self.settings.command_queue_depth,
+            "commands_running": len(self.running) + (self.persistent is not None),
+            "commands_started": self.started,
+            "commands_failed": self.failed,
+            "commands_timed_out": self.timed_out,
+            "commands_dropped": self.dropped,
+        }
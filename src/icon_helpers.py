@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import threading
+import configparser
+
+# Follows the freedesktop.org icon theme specification
+# See here: https://specifications.freedesktop.org/icon-theme-spec/latest/
+INDEX_VERSION = 1
+ICON_EXTENSIONS = (".png", ".svg", ".xpm")
+# How often (in seconds) lookups check whether the icon directories changed
+RECHECK_INTERVAL = 30
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _xdg_dir(variable, default):
+    return os.environ.get(variable) or os.path.expanduser(default)
+
+
+def cache_dir():
+    return os.path.join(_xdg_dir("XDG_CACHE_HOME", "~/.cache"), "yawns")
+
+
+def icon_base_dirs():
+    """
+    Directories where icon themes are looked up, in order of preference.
+    """
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [os.path.expanduser("~/.icons")]
+    dirs.append(os.path.join(_xdg_dir("XDG_DATA_HOME", "~/.local/share"), "icons"))
+    dirs += [os.path.join(d, "icons") for d in data_dirs.split(":") if d]
+    return list(dict.fromkeys(dirs))
+
+
+def _settings_files():
+    config_home = _xdg_dir("XDG_CONFIG_HOME", "~/.config")
+    return [
+        os.path.join(config_home, "gtk-3.0", "settings.ini"),
+        os.path.join(config_home, "gtk-4.0", "settings.ini"),
+        os.path.expanduser("~/.gtkrc-2.0"),
+    ]
+
+
+def current_theme_name():
+    """
+    Read the icon theme name from the GTK settings, the same place
+    Gtk.IconTheme.get_default() would take it from.
+    """
+    for path in _settings_files():
+        if not os.path.isfile(path):
+            continue
+        try:
+            if path.endswith(".ini"):
+                settings = configparser.ConfigParser(interpolation=None)
+                settings.read(path)
+                name = settings.get("Settings", "gtk-icon-theme-name", fallback=None)
+            else:
+                name = None
+                with open(path) as gtkrc:
+                    for line in gtkrc:
+                        key, _, value = line.partition("=")
+                        if key.strip() == "gtk-icon-theme-name":
+                            name = value.strip().strip('"')
+        except (OSError, configparser.Error) as e:
+            print(f"Error reading {path}: {e}")
+            continue
+        if name:
+            return name
+    return "hicolor"
+
+
+def _read_theme(theme_name, base_dirs):
+    """
+    Returns the parsed index.theme of a theme and the directories
+    it's installed in.
+    """
+    theme_dirs = [
+        os.path.join(base, theme_name)
+        for base in base_dirs
+        if os.path.isdir(os.path.join(base, theme_name))
+    ]
+    for theme_dir in theme_dirs:
+        index_path = os.path.join(theme_dir, "index.theme")
+        if os.path.isfile(index_path):
+            theme = configparser.ConfigParser(interpolation=None, strict=False)
+            theme.optionxform = str
+            try:
+                theme.read(index_path)
+            except configparser.Error as e:
+                print(f"Error reading {index_path}: {e}")
+                return None, theme_dirs
+            return theme, theme_dirs
+    return None, theme_dirs
+
+
+def _theme_chain(theme_name, base_dirs):
+    """
+    Resolve a theme and everything it inherits from, hicolor last.
+    """
+    chain = []
+    pending = [theme_name]
+    while pending:
+        name = pending.pop(0)
+        if name in chain or name == "hicolor":
+            continue
+        theme, _ = _read_theme(name, base_dirs)
+        if theme is None:
+            continue
+        chain.append(name)
+        inherits = theme.get("Icon Theme", "Inherits", fallback="")
+        pending += [i.strip() for i in inherits.split(",") if i.strip()]
+    chain.append("hicolor")
+    return chain
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def build_index(theme_name=None):
+    """
+    Scan the icon theme (and the themes it inherits from) and build a
+    name -> candidates index.
+
+    To keep the index compact, icons only store the position of their
+    directory in "dirs" and their extension.
+    """
+    base_dirs = icon_base_dirs()
+    if theme_name is None:
+        theme_name = current_theme_name()
+
+    index = {
+        "version": INDEX_VERSION,
+        "theme": theme_name,
+        "dirs": [],
+        "icons": {},
+        "pixmaps": {},
+        "stamp": {},
+    }
+    stamp = index["stamp"]
+    for path in base_dirs + _settings_files():
+        stamp[path] = _mtime(path)
+
+    def add_icons(directory, dir_index, target):
+        stamp[directory] = _mtime(directory)
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            if ext not in ICON_EXTENSIONS:
+                continue
+            if dir_index is None:
+                # Pixmaps, keep the preferred extension only
+                current = target.get(name)
+                if current is None or ICON_EXTENSIONS.index(ext) < ICON_EXTENSIONS.index(
+                    os.path.splitext(current)[1]
+                ):
+                    target[name] = entry.path
+            else:
+                target.setdefault(name, []).append([dir_index, ext])
+
+    for rank, name in enumerate(_theme_chain(theme_name, base_dirs)):
+        theme, theme_dirs = _read_theme(name, base_dirs)
+        if theme is None:
+            continue
+        for theme_dir in theme_dirs:
+            stamp[theme_dir] = _mtime(theme_dir)
+
+        subdirs = theme.get("Icon Theme", "Directories", fallback="").split(",")
+        subdirs += theme.get("Icon Theme", "ScaledDirectories", fallback="").split(",")
+        for subdir in dict.fromkeys(d.strip() for d in subdirs if d.strip()):
+            if not theme.has_section(subdir):
+                continue
+            section = theme[subdir]
+            try:
+                size = int(section.get("Size", 0))
+                scale = int(section.get("Scale", 1))
+                min_size = int(section.get("MinSize", size))
+                max_size = int(section.get("MaxSize", size))
+                threshold = int(section.get("Threshold", 2))
+            except ValueError:
+                continue
+            dir_type = section.get("Type", "Threshold")
+            for theme_dir in theme_dirs:
+                directory = os.path.join(theme_dir, subdir)
+                if not os.path.isdir(directory):
+                    continue
+                index["dirs"].append(
+                    [rank, directory, dir_type, size, min_size, max_size, threshold, scale]
+                )
+                add_icons(directory, len(index["dirs"]) - 1, index["icons"])
+
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    for data_dir in data_dirs.split(":"):
+        if data_dir:
+            add_icons(os.path.join(data_dir, "pixmaps"), None, index["pixmaps"])
+
+    return index
+
+
+def index_path(theme_name):
+    return os.path.join(cache_dir(), f"icon-index-{theme_name}.json")
+
+
+def index_is_stale(index):
+    """
+    An index is stale if any directory it was built from changed.
+    Adding or removing icons updates the mtime of their directory.
+    """
+    return any(_mtime(path) != mtime for path, mtime in index["stamp"].items())
+
+
+def save_index(index):
+    path = index_path(index["theme"])
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as index_file:
+            json.dump(index, index_file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error saving icon index: {e}")
+
+
+def read_index(theme_name):
+    try:
+        with open(index_path(theme_name)) as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION or index.get("theme") != theme_name:
+        return None
+    return index
+
+
+def load_icon_index():
+    """
+    Get the icon index, reading it from the on-disk cache or rebuilding
+    it if the theme or its directories changed.
+    """
+    global _index
+    with _index_lock:
+        now = time.monotonic()
+        if _index is not None and now - _index["checked"] < RECHECK_INTERVAL:
+            return _index
+
+        theme_name = current_theme_name()
+        index = _index
+        if index is None or index["theme"] != theme_name:
+            index = read_index(theme_name)
+        if index is None or index_is_stale(index):
+            index = build_index(theme_name)
+            save_index(index)
+
+        index["checked"] = now
+        _index = index
+        return _index
+
+
+def _matches_size(icon_dir, size):
+    dir_type, dir_size, min_size, max_size, threshold = icon_dir[2:7]
+    if dir_type == "Fixed":
+        return dir_size == size
+    if dir_type == "Scalable":
+        return min_size <= size <= max_size
+    return dir_size - threshold <= size <= dir_size + threshold
+
+
+def _size_distance(icon_dir, size):
+    dir_type, dir_size, min_size, max_size, threshold, scale = icon_dir[2:8]
+    if dir_type == "Scalable":
+        if size < min_size * scale:
+            return min_size * scale - size
+        if size > max_size * scale:
+            return size - max_size * scale
+        return 0
+    if dir_type == "Threshold":
+        if size < (dir_size - threshold) * scale:
+            return (dir_size - threshold) * scale - size
+        if size > (dir_size + threshold) * scale:
+            return size - (dir_size + threshold) * scale
+        return 0
+    return abs(dir_size * scale - size)
+
+
+def find_icon(icon_name, size=64):
+    """
+    Search for an application icon in a freedesktop.org-compliant icon theme.
+
+    Args:
+        icon_name (str): Name of the application icon to search for.
+        size (int): Size of the icon in pixels (default is 64).
+
+    Returns:
+        str: Full path to the icon image, or None if not found.
+    """
+    index = load_icon_index()
+    candidates = index["icons"].get(icon_name)
+    if candidates:
+        dirs = index["dirs"]
+        best = None
+        best_key = None
+        for dir_index, ext in candidates:
+            icon_dir = dirs[dir_index]
+            # Themes earlier in the inheritance chain win, then
+            # exact size matches, then the closest size
+            key = (
+                icon_dir[0],
+                0 if icon_dir[7] == 1 and _matches_size(icon_dir, size) else 1,
+                _size_distance(icon_dir, size),
+                ICON_EXTENSIONS.index(ext),
+            )
+            if best_key is None or key < best_key:
+                best, best_key = (icon_dir[1], ext), key
+        return os.path.join(best[0], icon_name + best[1])
+
+    return index["pixmaps"].get(icon_name)
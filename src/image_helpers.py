@@ -0,0 +1,175 @@
+import os
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from icon_helpers import find_icon, load_icon_index
+
+
+def raw_image(image_data):
+    """
+    Describe a raw (iiibiiay) image struct without copying or
+    re-encoding its pixels. Only 8 bit RGB/RGBA buffers are supported.
+    Returns None if the struct can't be displayed.
+    """
+    width, height, rowstride, has_alpha, bits_per_sample, channels, data = image_data
+
+    if bits_per_sample != 8 or channels not in (3, 4):
+        print(
+            f"Unsupported image format: {bits_per_sample} bits per sample, {channels} channels"
+        )
+        return None
+    if width <= 0 or height <= 0 or rowstride < width * channels:
+        print(f"Invalid image geometry: {width}x{height}, rowstride {rowstride}")
+        return None
+    # The last row doesn't need to be padded up to the rowstride
+    if len(data) < rowstride * (height - 1) + width * channels:
+        print(f"Image buffer too short for {width}x{height}, rowstride {rowstride}")
+        return None
+
+    return {
+        "width": width,
+        "height": height,
+        "rowstride": rowstride,
+        "has_alpha": bool(has_alpha),
+        "bits_per_sample": bits_per_sample,
+        "channels": channels,
+        "buffer": data,
+    }
+
+
+def image_key(data):
+    """
+    Content hash used to share decoded pixmaps between notifications
+    carrying the same image.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_image_file(image_path, hint_name):
+    """
+    Read an image from a path or a freedesktop icon name.
+    Returns the file contents or None.
+    """
+    image_path = image_path.replace("file://", "")
+    if not os.path.exists(image_path):
+        fd_icon = find_icon(image_path)
+        if not fd_icon:
+            print(
+                f"Provided {hint_name} is neither a valid image or name in a freedesktop.org-compliant icon theme: {image_path}"
+            )
+            return None
+        image_path = fd_icon
+
+    try:
+        with open(image_path, "rb") as img_file:
+            return img_file.read()
+    except Exception as e:
+        print(f"Error opening image file: {e}")
+    return None
+
+
+def image_source(app_icon, hints):
+    """
+    Pick where the image for a notification comes from according to the
+    freedesktop specification.
+    See here: https://specifications.freedesktop.org/notification-spec/1.2/icons-and-images.html#icons-and-images-formats
+    Returns "image-data", "image-path", "app_icon", "icon_data" or None.
+    """
+    if "image-data" in hints:
+        return "image-data"
+    if "image-path" in hints:
+        return "image-path"
+    if app_icon:
+        return "app_icon"
+    if "icon_data" in hints:
+        return "icon_data"
+    return None
+
+
+def load_image(app_icon, hints):
+    """
+    Load a file based notification image (image-path or app_icon).
+    Raw image hints don't need any loading, see raw_image.
+    """
+    source = image_source(app_icon, hints)
+    if source == "image-path":
+        return read_image_file(hints["image-path"].value, "image-path")
+    if source == "app_icon":
+        return read_image_file(app_icon, "app_icon")
+    return None
+
+
+def load_keyed_image(app_icon, hints):
+    """
+    load_image plus the content hash of the result
+    """
+    img_byte_arr = load_image(app_icon, hints)
+    if not img_byte_arr:
+        return None, ""
+    return img_byte_arr, image_key(img_byte_arr)
+
+
+class ImageDecoder:
+    """
+    Bounded worker pool that loads notification images (file reads and
+    icon theme lookups) off the D-Bus event loop.
+
+    Jobs beyond max_pending are dropped (the notification is shown
+    without an image) so a burst of large images can't pile up
+    unbounded work behind the loop.
+    """
+
+    def __init__(self, workers=2, max_pending=32):
+        self.max_pending = max(1, max_pending)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="yawns-image"
+        )
+        self.pending = 0
+        self.peak_pending = 0
+        self.decoded = 0
+        self.dropped = 0
+        # Get the icon theme index ready before the first lookup needs it
+        self.executor.submit(load_icon_index)
+
+    def submit(self, app_icon, hints, callback):
+        """
+        Queue an image load. callback(img_byte_arr, img_key) is called on
+        the event loop once it finishes.
+        Returns False if the queue is full and the job was dropped.
+        Must be called from the running event loop.
+        """
+        if self.pending >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        future = loop.run_in_executor(
+            self.executor, load_keyed_image, app_icon, hints
+        )
+
+        def done(future):
+            self.pending -= 1
+            img_byte_arr, img_key = None, ""
+            try:
+                img_byte_arr, img_key = future.result()
+            except Exception as e:
+                print(f"Error loading image: {e}")
+            self.decoded += 1
+            callback(img_byte_arr, img_key)
+
+        future.add_done_callback(done)
+        return True
+
+    def stats(self):
+        return {
+            "image_queue_depth": self.pending,
+            "image_queue_peak": self.peak_pending,
+            "image_queue_max": self.max_pending,
+            "images_decoded": self.decoded,
+            "images_dropped": self.dropped,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
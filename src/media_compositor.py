@@ -0,0 +1,155 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QPainterPath, QPixmap
+
+from yawns_notifications import load_icon_image
+
+DEFAULT_VINYL = "/usr/share/yawns/assets/vinyl.png"
+# Scaled backgrounds kept around, one per (file, size)
+MAX_BACKGROUNDS = 8
+
+
+def compose_vinyl(image, background):
+    """
+    Crop image to a square, scale it to half the background's size
+    and draw it in a circle over the middle of the background
+    """
+    size = min(image.width(), image.height())
+    image = image.copy(
+        (image.width() - size) // 2,
+        (image.height() - size) // 2,
+        size,
+        size,
+    )
+    scaled_size = round(background.width() * 0.5)
+    image = image.scaled(
+        scaled_size,
+        scaled_size,
+        Qt.KeepAspectRatioByExpanding,
+        Qt.SmoothTransformation,
+    )
+
+    result = QImage(background.size(), QImage.Format_ARGB32_Premultiplied)
+    result.fill(Qt.transparent)
+    painter = QPainter(result)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.drawImage(0, 0, background)
+    x = (background.width() - scaled_size) // 2
+    y = (background.height() - scaled_size) // 2
+    path = QPainterPath()
+    path.addEllipse(x, y, scaled_size, scaled_size)
+    painter.setClipPath(path)
+    painter.drawImage(x, y, image)
+    painter.end()
+    return result
+
+
+class MediaCompositor(QObject):
+    """
+    Builds the media yawn's vinyl (the notification image rounded over
+    the background) in a worker thread.
+
+    The whole pipeline (decode, crop, scale, clip and composite) runs
+    on QImage, only the final QPixmap is made back on the GUI thread,
+    where it goes into the app's pixmap cache. Backgrounds are loaded
+    and scaled once per file and size. Requests for a vinyl that's
+    already being built wait for that same job.
+    """
+
+    composed = pyqtSignal(object, object)
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="yawns-media"
+        )
+        self.backgrounds = OrderedDict()
+        self.backgrounds_lock = threading.Lock()
+        # cache key -> callbacks waiting for it
+        self.pending = {}
+        self.jobs = 0
+        self.composed.connect(self.finished)
+
+    def background(self, path, size):
+        """
+        The background at path scaled to size, loaded on first use.
+        Runs in the worker.
+        """
+        with self.backgrounds_lock:
+            image = self.backgrounds.get((path, size), None)
+            if image is not None:
+                self.backgrounds.move_to_end((path, size))
+                return image
+
+        image = QImage()
+        if not image.load(path):
+            print(
+                f"Failed to load {path} for a media yawn, defaulting to {DEFAULT_VINYL}"
+            )
+            image.load(DEFAULT_VINYL)
+        image = image.scaled(
+            size, size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+        ).convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+        with self.backgrounds_lock:
+            self.backgrounds[(path, size)] = image
+            while len(self.backgrounds) > MAX_BACKGROUNDS:
+                self.backgrounds.popitem(last=False)
+        return image
+
+    def compose(self, key, info_dict, icon_size, vinyl_path, callback):
+        """
+        Build the vinyl for the image in info_dict. callback(key, pixmap)
+        is called on the GUI thread once it's done, pixmap is None if
+        there was no usable image.
+        """
+        callbacks = self.pending.get(key, None)
+        if callbacks is not None:
+            callbacks.append(callback)
+            return
+        self.pending[key] = [callback]
+        self.jobs += 1
+
+        # Only what the job needs, info_dict may change meanwhile
+        source = {
+            "img_raw": info_dict.get("img_raw", None),
+            "img_byte_arr": info_dict.get("img_byte_arr", None),
+        }
+
+        def job():
+            image = None
+            try:
+                image = load_icon_image(source)
+                if image is not None:
+                    image = compose_vinyl(
+                        image, self.background(vinyl_path, icon_size)
+                    )
+            except Exception as e:
+                print(f"Error composing media image: {e}")
+                image = None
+            self.composed.emit(key, image)
+
+        self.executor.submit(job)
+
+    def finished(self, key, image):
+        pixmap = None
+        if image is not None:
+            pixmap = QPixmap.fromImage(image)
+            if key[0]:
+                self.app.pixmap_cache.put(key, pixmap)
+        for callback in self.pending.pop(key, ()):
+            callback(key, pixmap)
+
+    def stats(self):
+        return {
+            "media_jobs": self.jobs,
+            "media_pending": len(self.pending),
+            "media_backgrounds": len(self.backgrounds),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
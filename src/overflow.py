@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+
+
+class OverflowQueue:
+    """
+    Notifications waiting for a free slot, per yawn type.
+
+    Once a yawn type has max-visible yawns, further notifications of that
+    type are kept here as plain info_dicts (no window, widgets or timers)
+    and shown oldest first as yawns close. Each queue holds at most
+    max_queued notifications, past that the oldest ones are evicted.
+    """
+
+    def __init__(self):
+        self.queues = {}
+        # notification_id -> yawn type queued in
+        self.types = {}
+        self.queued = 0
+        self.evicted = 0
+
+    def push(self, yawn_class, info_dict, max_queued):
+        """
+        Queue a notification. Returns the info_dicts evicted to make room.
+        """
+        queue = self.queues.setdefault(yawn_class, OrderedDict())
+        id = info_dict["notification_id"]
+        info_dict["queued_at"] = time.monotonic()
+        queue[id] = info_dict
+        self.types[id] = yawn_class
+        self.queued += 1
+
+        evicted = []
+        while len(queue) > max(1, max_queued):
+            _, old = queue.popitem(last=False)
+            del self.types[old["notification_id"]]
+            evicted.append(old)
+        self.evicted += len(evicted)
+        return evicted
+
+    def pop(self, yawn_class):
+        """
+        The oldest notification queued for yawn_class, or None
+        """
+        queue = self.queues.get(yawn_class, None)
+        if not queue:
+            return None
+        _, info_dict = queue.popitem(last=False)
+        del self.types[info_dict["notification_id"]]
+        return info_dict
+
+    def get(self, id):
+        yawn_class = self.types.get(id, None)
+        if yawn_class is None:
+            return None
+        return self.queues[yawn_class][id]
+
+    def type_of(self, id):
+        return self.types.get(id, None)
+
+    def replace(self, info_dict):
+        """
+        Update a queued notification in place, keeping its turn
+        """
+        id = info_dict["notification_id"]
+        old = self.queues[self.types[id]][id]
+        info_dict["queued_at"] = old["queued_at"]
+        self.queues[self.types[id]][id] = info_dict
+
+    def remove(self, id):
+        yawn_class = self.types.pop(id, None)
+        if yawn_class is None:
+            return None
+        return self.queues[yawn_class].pop(id)
+
+    def count(self, yawn_class):
+        return len(self.queues.get(yawn_class, ()))
+
+    def __len__(self):
+        return len(self.types)
+
+    def stats(self):
+        return {
+            "overflow_queue_depth": len(self.types),
+            "overflow_queued": self.queued,
+            "overflow_evicted": self.evicted,
+        }
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+
+class PixmapCache:
+    """
+    LRU cache of decoded/scaled pixmaps shared by every yawn and clone.
+
+    Keys are built from the content hash of the notification image plus
+    whatever changes the rendered result (kind, target size, device
+    pixel ratio). Entries are evicted least recently used first once the
+    pixmaps held go over max_bytes.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key):
+        pixmap = self.entries.get(key, None)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def put(self, key, pixmap):
+        size = self.pixmap_bytes(pixmap)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.current_bytes -= self.pixmap_bytes(self.entries.pop(key))
+        self.entries[key] = pixmap
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.current_bytes -= self.pixmap_bytes(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        return {
+            "pixmap_cache_entries": len(self.entries),
+            "pixmap_cache_bytes": self.current_bytes,
+            "pixmap_cache_hits": self.hits,
+            "pixmap_cache_misses": self.misses,
+            "pixmap_cache_evictions": self.evictions,
+        }
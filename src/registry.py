@@ -0,0 +1,32 @@
+class YawnRegistry:
+    """
+    Index of the live (primary) yawns by notification id, so closing,
+    replacing or updating a notification never has to walk every yawn.
+
+    A yawn stays registered under the id of the notification it shows.
+    Whatever swaps a yawn's info_dict for another notification's must
+    remove it first and add it back after.
+    """
+
+    def __init__(self):
+        self.by_id = {}
+
+    def add(self, yawn):
+        self.by_id[yawn.info_dict["notification_id"]] = yawn
+
+    def remove(self, yawn):
+        id = yawn.info_dict["notification_id"]
+        # The id may already belong to the yawn that replaced this one
+        if self.by_id.get(id, None) is yawn:
+            del self.by_id[id]
+
+    def get(self, id):
+        return self.by_id.get(id, None)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def stats(self):
+        return {
+            "yawns_live": len(self.by_id),
+        }
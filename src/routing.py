@@ -0,0 +1,140 @@
+import re
+import fnmatch
+
+YAWN_TYPES = {"corner": 1, "center": 2, "media": 3}
+URGENCIES = {"low": 0, "normal": 1, "critical": 2}
+# Fields matched against whitespace separated glob patterns
+MATCH_FIELDS = ("app_name", "summary", "body", "sender", "category", "desktop-entry")
+# Filters the yawn type sections have always supported
+LEGACY_FIELDS = ("app_name", "summary", "body")
+# Per rule overrides of the yawn type section settings
+OVERRIDES = ("timeout", "icon-size", "min_urgency")
+GLOB_CHARS = set("*?[")
+
+
+def compile_globs(value):
+    """
+    Combine whitespace separated glob patterns into a single regex
+    """
+    return re.compile(
+        "|".join(f"(?:{fnmatch.translate(glob)})" for glob in value.split())
+    )
+
+
+class Rule:
+    def __init__(self, name, order, yawn_type=None, priority=0):
+        self.name = name
+        self.order = order
+        self.yawn_type = yawn_type
+        self.priority = priority
+        # Set when every app_name pattern is a plain name,
+        # the rule is then only tried for those apps
+        self.app_names = None
+        self.patterns = []
+        self.urgencies = None
+        self.overrides = {}
+
+    def add_patterns(self, field, value):
+        globs = value.split()
+        if field == "app_name" and not any(GLOB_CHARS & set(glob) for glob in globs):
+            self.app_names = set(globs)
+        else:
+            self.patterns.append((field, compile_globs(value)))
+
+    def matches(self, values):
+        for field, pattern in self.patterns:
+            value = values[field]
+            if not value or not pattern.match(value):
+                return False
+        return self.urgencies is None or values["urgency"] in self.urgencies
+
+
+class Router:
+    """
+    Picks the yawn type (and setting overrides) for a notification.
+
+    Rules are compiled once from the config: the filters in the yawn type
+    sections plus any [rule:<name>] section. Every condition in a rule
+    must match and the highest priority rule wins, ties going to the
+    rule defined last. Rules for plain app names are indexed by name,
+    so routing only tries the rules that can possibly match.
+    """
+
+    def __init__(self, config):
+        rules = self.read_rules(config)
+        rules.sort(key=lambda rule: (rule.priority, rule.order), reverse=True)
+        self.generic = [rule for rule in rules if rule.app_names is None]
+        self.by_app = {}
+        for rule in rules:
+            for app_name in rule.app_names or ():
+                self.by_app[app_name] = None
+        for app_name in self.by_app:
+            self.by_app[app_name] = [
+                rule
+                for rule in rules
+                if rule.app_names is None or app_name in rule.app_names
+            ]
+
+    @staticmethod
+    def read_rules(config):
+        rules = []
+        if config is None:
+            return rules
+
+        # Filters set right under the yawn type sections,
+        # a later section wins over an earlier one
+        for section, yawn_type in YAWN_TYPES.items():
+            for field in LEGACY_FIELDS:
+                value = config.get(section, field, fallback=None)
+                if value and value.split():
+                    rule = Rule(f"{section}.{field}", len(rules), yawn_type)
+                    rule.add_patterns(field, value)
+                    rules.append(rule)
+
+        for section in config.sections():
+            if not section.startswith("rule:"):
+                continue
+            options = config[section]
+            try:
+                yawn_type = None
+                if "yawn" in options:
+                    yawn_type = YAWN_TYPES[options["yawn"].strip().lower()]
+                rule = Rule(
+                    section[5:], len(rules), yawn_type, options.getint("priority", 0)
+                )
+                for field in MATCH_FIELDS:
+                    if options.get(field, "").split():
+                        rule.add_patterns(field, options[field])
+                if options.get("urgency", "").split():
+                    rule.urgencies = {
+                        URGENCIES[u] if u in URGENCIES else int(u)
+                        for u in options["urgency"].lower().split()
+                    }
+                for key in OVERRIDES:
+                    if key in options:
+                        rule.overrides[key.replace("-", "_")] = int(options[key])
+            except (KeyError, ValueError) as e:
+                print(f"Ignoring invalid routing rule [{section}]: {e}")
+                continue
+            rules.append(rule)
+        return rules
+
+    def route(self, info_dict):
+        """
+        Returns the rule matching the notification, or None
+        """
+        hints = info_dict["hints"]
+        values = {
+            "app_name": info_dict["app_name"],
+            "summary": info_dict["summary"],
+            "body": info_dict["body"],
+            "sender": info_dict.get("sender_id", ""),
+            "urgency": int(hints["urgency"].value) if "urgency" in hints else 1,
+        }
+        for hint in ("category", "desktop-entry"):
+            values[hint] = str(hints[hint].value) if hint in hints else ""
+
+        for rule in self.by_app.get(values["app_name"], self.generic):
+            if rule.matches(values):
+                return rule
+        return None
@@ -0,0 +1,121 @@
+import configparser
+from dataclasses import dataclass, fields, replace
+
+
+@dataclass(frozen=True)
+class GeneralSettings:
+    command: str = ""
+    command_mode: str = "exec"
+    command_workers: int = 4
+    command_timeout: int = 10000
+    command_queue_depth: int = 64
+    mouse_left_click: str = "close"
+    mouse_right_click: str = "close"
+    mouse_middle_click: str = "close"
+    pixmap_cache_size: int = 32
+    yawn_pool_size: int = 8
+    yawn_prewarm: int = 2
+
+
+@dataclass(frozen=True)
+class YawnSettings:
+    timeout: int = 5250
+    width: int = 400
+    height: int = 500
+    icon_size: int = 64
+    x_offset: int = -40
+    y_offset: int = -40
+    gap: int = 10
+    min_urgency: int = 2
+    monitor: str = "primary"
+    show_buttons: bool = False
+    fps: int = 30
+    bg_icon: str = ""
+    max_visible: int = 8
+    max_queued: int = 100
+
+
+# Each yawn type has its own defaults
+SECTION_DEFAULTS = {
+    "general": GeneralSettings(),
+    "corner": YawnSettings(),
+    "center": YawnSettings(width=220, height=220),
+    "media": YawnSettings(x_offset=40),
+}
+# Older names some options are still read from
+ALIASES = {"min_urgency": ("fs_urgency",)}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Snapshot of the whole config, parsed and typed once.
+
+    Yawns hold a reference to their section, so a reload just builds a
+    new snapshot and hands it out. The raw parser is kept for the parts
+    that read their own sections (routing rules, admission control).
+    """
+
+    path: str
+    parser: configparser.ConfigParser
+    general: GeneralSettings
+    corner: YawnSettings
+    center: YawnSettings
+    media: YawnSettings
+
+
+def read_section(parser, section, defaults):
+    """
+    Build a settings object for section, options missing or
+    invalid keep their default value
+    """
+    values = {}
+    if not parser.has_section(section):
+        return defaults
+    options = parser[section]
+    for field in fields(defaults):
+        names = (field.name.replace("_", "-"), field.name) + ALIASES.get(field.name, ())
+        option = next((name for name in names if name in options), None)
+        if option is None:
+            continue
+        try:
+            if field.type is bool:
+                values[field.name] = options.getboolean(option)
+            elif field.type is int:
+                values[field.name] = options.getint(option)
+            else:
+                values[field.name] = options[option]
+        except ValueError as e:
+            print(f"Invalid value for {option} in [{section}]: {e}")
+    return replace(defaults, **values)
+
+
+def load_settings(path, previous=None):
+    """
+    Read the config file at path. If it's missing, unreadable or can't
+    be parsed, previous is kept (or the defaults are used when there's
+    none).
+    """
+    parser = configparser.ConfigParser()
+    try:
+        # read() skips files it can't open instead of raising
+        if parser.read(path):
+            return parse_settings(path, parser)
+        if previous is not None:
+            print(f"Could not read config file {path}, keeping the current settings")
+    except (configparser.Error, UnicodeDecodeError) as e:
+        print(f"Error reading config file: {e}")
+    if previous is not None:
+        return previous
+    return parse_settings(path, configparser.ConfigParser())
+
+
+def parse_settings(path, parser):
+    return Settings(
+        path,
+        parser,
+        **{
+            section: read_section(parser, section, defaults)
+            for section, defaults in SECTION_DEFAULTS.items()
+        },
+    )
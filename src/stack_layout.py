@@ -0,0 +1,53 @@
+class StackLayout:
+    """
+    Places every yawn in a single pass.
+
+    Each yawn type has one stack per screen, in the order the yawns were
+    shown (the newest sits at the configured corner). Every yawn's
+    position follows from the space taken by the ones after it in its
+    stack, clones mirror their primary on their own screen, and only
+    the yawns whose position changed get moved.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.passes = 0
+        self.moves = 0
+
+    def layout(self):
+        self.passes += 1
+        for yawn_class, yawn_list in self.app.yawn_arrays.items():
+            # (screen) -> space taken by the yawns already placed
+            stack_offsets = {}
+            for yawn in reversed(yawn_list):
+                screen = yawn.get_target_screen()
+                geo = screen.geometry()
+                stack_offset = stack_offsets.get(screen, 0)
+                position = yawn.stack_position(geo, stack_offset)
+                self.place(yawn, position)
+                stack_offsets[screen] = stack_offset + yawn.stack_height()
+
+                for clone in yawn.clones:
+                    clone_geo = clone.get_target_screen().geometry()
+                    self.place(clone, position - geo.topLeft() + clone_geo.topLeft())
+
+            # The overflow yawn goes past the end of its stack
+            overflow_yawn = self.app.overflow_yawns.get(yawn_class, None)
+            if overflow_yawn is not None and (
+                overflow_yawn.isVisible() or overflow_yawn.pending_map
+            ):
+                screen = overflow_yawn.get_target_screen()
+                self.place(
+                    overflow_yawn,
+                    overflow_yawn.stack_position(
+                        screen.geometry(), stack_offsets.get(screen, 0)
+                    ),
+                )
+
+    def place(self, yawn, position):
+        if yawn.pos() != position:
+            yawn.move(position)
+            self.moves += 1
+
+    def stats(self):
+        return {"layout_passes": self.passes, "layout_moves": self.moves}
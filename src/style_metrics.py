@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+
+SIDES = ("top", "right", "bottom", "left")
+
+
+@dataclass(frozen=True)
+class BoxMetrics:
+    border: int = 0
+    margin_top: int = 0
+    margin_right: int = 0
+    margin_bottom: int = 0
+    margin_left: int = 0
+    padding_top: int = 0
+    padding_right: int = 0
+    padding_bottom: int = 0
+    padding_left: int = 0
+
+
+def px(value):
+    try:
+        return round(float(value.replace("px", "")))
+    except ValueError:
+        return 0
+
+
+def expand_sides(value):
+    """
+    Values for top, right, bottom and left from a margin/padding shorthand
+    """
+    values = value.split()
+    if len(values) == 1:  # All sides same
+        return values * 4
+    if len(values) == 2:  # Vertical | Horizontal
+        return [values[0], values[1], values[0], values[1]]
+    if len(values) == 3:  # Top | Horizontal | Bottom
+        return [values[0], values[1], values[2], values[1]]
+    return values[:4]  # Top | Right | Bottom | Left
+
+
+class StyleMetrics:
+    """
+    Box metrics (border width, margins and padding) of the stylesheet
+    selectors, which yawns need to size their text.
+
+    The stylesheet is parsed the first time metrics are asked for, and
+    the metrics of each selector are resolved once. A new StyleMetrics
+    is made whenever the stylesheet changes.
+    """
+
+    def __init__(self, stylesheet):
+        self.stylesheet = stylesheet
+        self.rules = None
+        self.boxes = {}
+
+    def parse(self):
+        # cssutils is slow to import, and only needed here
+        import cssutils
+
+        self.rules = []
+        for rule in cssutils.parseString(self.stylesheet):
+            if rule.type == rule.STYLE_RULE:
+                self.rules.append(
+                    (
+                        rule.selectorText.strip(),
+                        [(prop.name, prop.value) for prop in rule.style],
+                    )
+                )
+
+    def box(self, selector):
+        """
+        Resolved BoxMetrics for selector, later declarations win
+        """
+        box = self.boxes.get(selector, None)
+        if box is not None:
+            return box
+        if self.rules is None:
+            self.parse()
+
+        values = {}
+        for rule_selector, properties in self.rules:
+            if rule_selector != selector:
+                continue
+            for name, value in properties:
+                if name == "border":
+                    values["border"] = px(value.split()[0])
+                elif name in ("margin", "padding"):
+                    for side, side_value in zip(SIDES, expand_sides(value)):
+                        values[f"{name}_{side}"] = px(side_value)
+                elif name.startswith(("margin-", "padding-")):
+                    field = name.replace("-", "_")
+                    if field in BoxMetrics.__dataclass_fields__:
+                        values[field] = px(value)
+
+        box = BoxMetrics(**values)
+        self.boxes[selector] = box
+        return box
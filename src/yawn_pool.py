@@ -0,0 +1,87 @@
+from PyQt5.QtCore import QTimer
+
+from yawns_notifications import CornerYawn, CenterYawn, MediaYawn
+
+YAWN_CLASSES = {cls.__name__: cls for cls in (CornerYawn, CenterYawn, MediaYawn)}
+
+
+class YawnPool:
+    """
+    Closed yawns, kept hidden per type to be reused.
+
+    Building a yawn means a native window, its window properties and a
+    dozen styled widgets, so a closed one is kept (up to `size` per type)
+    and gets the next notification of its type through bind(). On
+    startup `prewarm` yawns of each type are built ahead of time, one
+    per event loop iteration so they never hold up a notification.
+    """
+
+    def __init__(self, app, size=8, prewarm=2):
+        self.app = app
+        self.size = size
+        self.prewarm = prewarm
+        self.free = {name: [] for name in YAWN_CLASSES}
+        self.hits = 0
+        self.misses = 0
+        self.prewarm_timer = QTimer()
+        self.prewarm_timer.setInterval(0)
+        self.prewarm_timer.timeout.connect(self.prewarm_one)
+
+    def configure(self, size, prewarm):
+        """
+        Drop the pooled yawns (they were built with the old settings)
+        and start filling the pool again
+        """
+        self.size = size
+        self.prewarm = prewarm
+        for yawns in self.free.values():
+            for yawn in yawns:
+                yawn.deleteLater()
+            yawns.clear()
+        self.start_prewarm()
+
+    def start_prewarm(self):
+        if self.prewarm > 0 and self.size > 0:
+            self.prewarm_timer.start()
+
+    def prewarm_one(self):
+        for name, cls in YAWN_CLASSES.items():
+            if len(self.free[name]) < min(self.prewarm, self.size):
+                yawn = cls(self.app, self.app.settings)
+                # Create the native window and style it now,
+                # not when the first notification arrives
+                yawn.winId()
+                yawn.ensurePolished()
+                self.free[name].append(yawn)
+                return
+        self.prewarm_timer.stop()
+
+    def acquire(self, cls, info_dict):
+        """
+        A yawn of the given class showing info_dict,
+        reused from the pool if there's one
+        """
+        free = self.free[cls.__name__]
+        if free:
+            self.hits += 1
+            yawn = free.pop()
+            yawn.bind(info_dict)
+            return yawn
+        self.misses += 1
+        return cls(self.app, self.app.settings, info_dict)
+
+    def release(self, yawn):
+        """
+        Take back a closed yawn, unless the pool for its type is full
+        """
+        yawn.reset()
+        free = self.free[yawn.yawn_class]
+        if len(free) < self.size and yawn not in free:
+            free.append(yawn)
+
+    def stats(self):
+        return {
+            "yawn_pool_free": sum(len(yawns) for yawns in self.free.values()),
+            "yawn_pool_hits": self.hits,
+            "yawn_pool_misses": self.misses,
+        }
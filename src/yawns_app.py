@@ -0,0 +1,880 @@
+import os
+import time
+import socket
+import asyncio
+from pathlib import Path
+
+from PyQt5.QtCore import (
+    QFileSystemWatcher,
+    QObject,
+    QThread,
+    QSocketNotifier,
+    pyqtSignal,
+    QTimer,
+    Qt,
+)
+from PyQt5.QtWidgets import QApplication
+from dbus_next.constants import MessageType
+from dbus_next.message import Message
+
+from yawns_notifications import (
+    BaseYawn,
+    YawnType,
+    CornerYawn,
+    CenterYawn,
+    MediaYawn,
+    OverflowYawn,
+)
+from pixmap_cache import PixmapCache
+from routing import Router
+from hooks import HookRunner
+from registry import YawnRegistry
+from yawn_pool import YawnPool
+from style_metrics import StyleMetrics
+from stack_layout import StackLayout
+from overflow import OverflowQueue
+from animation_clock import AnimationClock
+from media_compositor import MediaCompositor
+from settings import load_settings
+from frontend import decode_notification, map_memfd, recv_packet, send_packet
+
+
+class NotificationService(QObject):
+    """
+    Glue between the D-Bus NotificationManager and the Qt app.
+
+    The asyncio loop it runs on is either its own, driven by a
+    NotificationManagerThread, or the Qt event loop itself through
+    qasync. Anything touching the bus is scheduled on that loop, so
+    it's safe to call into the service from the GUI thread.
+    """
+
+    notification_received = pyqtSignal(dict)
+    notification_closed = pyqtSignal(int)
+    image_received = pyqtSignal(int, object, str)
+    notification_repeated = pyqtSignal(int, int)
+    name_released = pyqtSignal()
+    stats_requested = pyqtSignal()
+
+    def __init__(self, loop, bus, manager):
+        super().__init__()
+        self.loop = loop
+        self.bus = bus
+        self.manager = manager
+        self.stats_provider = dict
+        # Last GUI counters, published from the GUI thread
+        self.stats_snapshot = {}
+        self.stats_requested.connect(self.publish_stats)
+        self.manager.notify_app = self.notify_app
+        self.manager.image_loaded = self.image_loaded
+        self.manager.notify_repeated = self.notify_repeated
+        self.manager.app_stats = self.app_stats
+        self.manager.close_notification = self.close_notification
+        self.manager.do_action_on_notification = self.do_action_on_notification
+
+    def notify_app(self, info_dict: dict):
+        """Emit a PyQt signal when a notification is received."""
+        self.notification_received.emit(info_dict)
+
+    def image_loaded(self, id, img_byte_arr, img_key):
+        """Emit a PyQt signal when a notification image finished loading."""
+        self.image_received.emit(id, img_byte_arr, img_key)
+
+    def notify_repeated(self, id, count):
+        """Emit a PyQt signal when a duplicate got merged into a notification."""
+        self.notification_repeated.emit(id, count)
+
+    def app_stats(self):
+        """
+        Called on the D-Bus loop. GUI state may only be read on the GUI
+        thread, so when the loop has its own thread this returns the
+        last stats published and asks for fresh ones.
+        """
+        if QThread.currentThread() == self.thread():
+            self.publish_stats()
+        else:
+            self.stats_requested.emit()
+        return self.stats_snapshot
+
+    def publish_stats(self):
+        self.stats_snapshot = self.stats_provider()
+
+    def close_notification(self, id, reason, sender_id):
+        """
+        Sends two signals, one (qt) to the yawns app to close the yawn with
+        the id provided and another one (dbus) to the sender app to tell it
+        the notification has been closed.
+        """
+        message = Message(
+            destination=sender_id,
+            message_type=MessageType.SIGNAL,  # Signal type
+            signature="uu",
+            interface="org.freedesktop.Notifications",
+            path="/org/freedesktop/Notifications",
+            member="NotificationClosed",
+            body=[int(id), int(reason)],
+        )
+        self.loop.call_soon_threadsafe(self.bus.send, message)
+        self.loop.call_soon_threadsafe(self.manager.forget_notification, int(id))
+        self.notification_closed.emit(id)
+
+    def do_action_on_notification(self, id, action, sender_id):
+        """
+        Performs an action on notification
+        The handling of the action depends on the sender app
+        """
+        message = Message(
+            destination=sender_id,
+            message_type=MessageType.SIGNAL,  # Signal type
+            signature="us",
+            interface="org.freedesktop.Notifications",
+            path="/org/freedesktop/Notifications",
+            member="ActionInvoked",
+            body=[id, action],
+        )
+        self.loop.call_soon_threadsafe(self.bus.send, message)
+
+    def release_name(self):
+        """
+        Give up org.freedesktop.Notifications, so the next notification
+        goes to whoever owns it next (or activates a new yawns).
+        name_released is emitted once done.
+        """
+
+        async def release():
+            try:
+                await self.bus.release_name("org.freedesktop.Notifications")
+            except Exception as e:
+                print(f"Error releasing the notification service: {e}")
+            self.name_released.emit()
+
+        asyncio.run_coroutine_threadsafe(release(), self.loop)
+
+    def stop(self):
+        """Stop background work owned by the manager."""
+        if self.manager:
+            self.manager.image_decoder.shutdown()
+
+
+class NotificationManagerThread(QThread):
+    """
+    Runs a NotificationService's asyncio loop in its own thread.
+    """
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def run(self):
+        """Run the D-Bus manager in its own thread."""
+        loop = self.service.loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def stop(self):
+        """Stop the event loop and thread."""
+        self.service.stop()
+        self.service.loop.call_soon_threadsafe(self.service.loop.stop)
+        self.quit()
+
+
+class RemoteNotificationService(QObject):
+    """
+    Stands in for NotificationService when the D-Bus name is owned by
+    a front end process (see frontend.py). Same signals and slots, but
+    everything goes through the front end's socket.
+    """
+
+    notification_received = pyqtSignal(dict)
+    notification_closed = pyqtSignal(int)
+    image_received = pyqtSignal(int, object, str)
+    notification_repeated = pyqtSignal(int, int)
+
+    def __init__(self, socket_path):
+        super().__init__()
+        self.socket_path = socket_path
+        self.sock = None
+        self.notifier = None
+        self.stats_provider = dict
+        self.reconnect_timer = QTimer()
+        self.reconnect_timer.setInterval(1000)
+        self.reconnect_timer.timeout.connect(self.connect_frontend)
+
+    def connect_frontend(self):
+        """Connect to the front end, retrying every second until it's up."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET | socket.SOCK_CLOEXEC)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            if not self.reconnect_timer.isActive():
+                print(f"Waiting for the yawns front end at {self.socket_path}...")
+                self.reconnect_timer.start()
+            return
+        self.reconnect_timer.stop()
+        sock.setblocking(False)
+        self.sock = sock
+        self.notifier = QSocketNotifier(sock.fileno(), QSocketNotifier.Read)
+        self.notifier.activated.connect(self.read_frontend)
+        print("Connected to the yawns front end")
+
+    def disconnect_frontend(self):
+        self.notifier.setEnabled(False)
+        self.notifier = None
+        self.sock.close()
+        self.sock = None
+        self.reconnect_timer.start()
+
+    def read_frontend(self):
+        while self.sock:
+            try:
+                message, fds = recv_packet(self.sock)
+            except BlockingIOError:
+                return
+            except (OSError, ValueError) as e:
+                print(f"Error reading from the front end: {e}")
+                self.disconnect_frontend()
+                return
+            if message is None:
+                print("Lost the yawns front end, reconnecting...")
+                self.disconnect_frontend()
+                return
+
+            op = message.get("op", None)
+            if op == "notify":
+                self.notification_received.emit(
+                    decode_notification(message["info"], fds)
+                )
+                continue
+            if op == "image":
+                img_byte_arr = None
+                if fds and message["size"]:
+                    img_byte_arr = bytes(map_memfd(fds.pop(), message["size"]))
+                self.image_received.emit(message["id"], img_byte_arr, message["key"])
+            elif op == "repeat":
+                self.notification_repeated.emit(message["id"], message["count"])
+            elif op == "closed":
+                self.notification_closed.emit(message["id"])
+            elif op == "stats":
+                self.send({"op": "stats", "stats": self.stats_provider()})
+            for fd in fds:
+                os.close(fd)
+
+    def send(self, message):
+        if not self.sock:
+            return
+        try:
+            send_packet(self.sock, message)
+        except OSError as e:
+            print(f"Error sending to the front end: {e}")
+
+    def close_notification(self, id, reason, sender_id):
+        self.send({"op": "close", "id": id, "reason": reason, "sender": sender_id})
+
+    def do_action_on_notification(self, id, action, sender_id):
+        self.send({"op": "action", "id": id, "action": action, "sender": sender_id})
+
+    def stop(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+
+class YawnsApp(QApplication):
+    request_notification_closing = pyqtSignal(int, int, str)
+    request_notification_action = pyqtSignal(int, str, str)
+    yawns_mapped = pyqtSignal(int)
+    idle = pyqtSignal()
+
+    def __init__(self, appname, display_info, settings, style_path):
+        self.setAttribute(Qt.AA_X11InitThreads)
+        super().__init__(appname)
+        self.display_info = display_info
+        self.settings = settings
+        self.router = Router(settings.parser)
+        self.pixmap_cache = PixmapCache(settings.general.pixmap_cache_size * 1024 * 1024)
+        self.hooks = HookRunner(settings.general)
+        self.aboutToQuit.connect(self.hooks.stop)
+
+        # Load stylesheet
+        self.style_path = style_path
+        try:
+            self.stylesheet = Path(style_path).read_text()
+            self.setStyleSheet(self.stylesheet)
+        except Exception as e:
+            print(f"Error reading stylesheet: {e}")
+            self.stylesheet = ""
+        self.style_metrics = StyleMetrics(self.stylesheet)
+
+        # Arrays for storing yawns
+        self.yawn_arrays = {
+            "CornerYawn": [],
+            "CenterYawn": [],
+            "MediaYawn": [],
+        }
+        self.fullscreen_detected = False
+
+        # Notifications received during the current event loop
+        # iteration (by id, so a replacement arriving in the same batch
+        # takes the place of the one it replaces), and the new yawns
+        # built for them while committing
+        self.pending_notifications = {}
+        self.yawns_to_map = None
+
+        # Live yawns by id, and closed ones kept to be reused
+        self.registry = YawnRegistry()
+        self.pool = YawnPool(
+            self, settings.general.yawn_pool_size, settings.general.yawn_prewarm
+        )
+        self.pool.start_prewarm()
+        self.stack_layout = StackLayout(self)
+        self.layout_scheduled = False
+        self.animation_clock = AnimationClock(settings.media.fps)
+        self.media_compositor = MediaCompositor(self)
+        self.aboutToQuit.connect(self.media_compositor.shutdown)
+
+        # Notifications waiting for a free slot, and the "+N more"
+        # yawn standing in for them at the end of the corner stack
+        self.overflow = OverflowQueue()
+        self.overflow_yawns = {}
+        self.promotion_scheduled = False
+        self.screenAdded.connect(lambda _: self.reset_screens())
+        self.screenRemoved.connect(lambda _: self.reset_screens())
+
+        # Fires once no yawn has been around for idle_exit seconds
+        self.idle_exit = 0
+        self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.idle.emit)
+
+    def handle_fullscreen_change(self, fullscreen):
+        """
+        Hide and show yawns depending on urgency and fullscreen state
+        """
+        self.fullscreen_detected = fullscreen
+
+        # Hide first, then lay out once and map everything left
+        to_map = []
+        for yawn_list in self.yawn_arrays.values():
+            for yawn in yawn_list:
+                min_urgency = yawn.setting("min_urgency")
+                should_hide = yawn.urgency < min_urgency and fullscreen
+
+                if should_hide:
+                    yawn.hide()
+                    for clone in yawn.clones:
+                        clone.hide()
+                elif not yawn.isVisible():
+                    yawn.pending_map = True
+                    to_map.append(yawn)
+
+        self.layout_yawns()
+        for yawn in to_map:
+            yawn.pending_map = False
+            yawn.map()
+        self.update_overflow_yawn("CornerYawn")
+
+    def reload_settings(self):
+        """
+        Read the config file again and apply it to every yawn
+        """
+        settings = load_settings(self.settings.path, self.settings)
+        if settings is not self.settings:
+            self.apply_settings(settings)
+            print("Config reloaded")
+
+    def apply_settings(self, settings):
+        """
+        Swap in a new settings snapshot
+        """
+        self.settings = settings
+        self.router = Router(settings.parser)
+        self.pixmap_cache.max_bytes = settings.general.pixmap_cache_size * 1024 * 1024
+        self.hooks.configure(settings.general)
+        self.animation_clock.set_fps(settings.media.fps)
+        self.pool.configure(settings.general.yawn_pool_size, settings.general.yawn_prewarm)
+        for yawn_list in self.yawn_arrays.values():
+            for yawn in yawn_list:
+                yawn.apply_settings(settings)
+                yawn.adjust_size()
+        overflow_yawn = self.overflow_yawns.get("CornerYawn", None)
+        if overflow_yawn is not None:
+            overflow_yawn.apply_settings(settings.corner)
+        self.layout_yawns()
+        # max-visible might have gone up
+        self.schedule_promotion()
+        if self.fullscreen_detected:
+            self.handle_fullscreen_change(True)
+
+    def reload_stylesheet(self):
+        """
+        Read the stylesheet again and re-fit every yawn to it
+        """
+        try:
+            stylesheet = Path(self.style_path).read_text()
+        except Exception as e:
+            print(f"Error reading stylesheet: {e}")
+            return
+        if stylesheet == self.stylesheet:
+            return
+        self.stylesheet = stylesheet
+        self.style_metrics = StyleMetrics(stylesheet)
+        self.setStyleSheet(stylesheet)
+        for yawn_list in self.yawn_arrays.values():
+            for yawn in yawn_list:
+                for each in [yawn, *yawn.clones]:
+                    each.update_text_width()
+                    each.adjust_size()
+        self.layout_yawns()
+        print("Stylesheet reloaded")
+
+    def watch_config(self):
+        """
+        Reload the config or the stylesheet whenever their file changes
+        """
+        self.config_watcher = QFileSystemWatcher(
+            [path for path in (self.settings.path, self.style_path) if os.path.isfile(path)]
+        )
+        reload_timers = {}
+        for path, reload in (
+            (self.settings.path, self.reload_settings),
+            (self.style_path, self.reload_stylesheet),
+        ):
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(200)
+            timer.timeout.connect(reload)
+            reload_timers[path] = timer
+
+        def file_changed(path):
+            # Editors often replace the file, which drops it from the watcher
+            if path not in self.config_watcher.files() and os.path.exists(path):
+                self.config_watcher.addPath(path)
+            reload_timers[path].start()
+
+        self.config_watcher.fileChanged.connect(file_changed)
+
+    def set_idle_exit(self, seconds):
+        """
+        Emit idle after this many seconds without yawns, 0 never does
+        """
+        self.idle_exit = seconds
+        self.idle_timer.setInterval(seconds * 1000)
+        self.update_idle_timer()
+
+    def update_idle_timer(self):
+        """
+        Start counting idle time once the last yawn is gone,
+        stop as soon as there's something to show again
+        """
+        if self.idle_exit <= 0:
+            return
+        if (
+            self.pending_notifications
+            or self.overflow
+            or any(self.yawn_arrays.values())
+        ):
+            self.idle_timer.stop()
+        elif not self.idle_timer.isActive():
+            self.idle_timer.start()
+
+    def queue_notification(self, info_dict):
+        """
+        Queue a received notification. Everything that arrives in the same
+        event loop iteration gets committed together
+        """
+        if not self.pending_notifications:
+            QTimer.singleShot(0, self.commit_notifications)
+        self.pending_notifications[info_dict["notification_id"]] = info_dict
+        self.idle_timer.stop()
+
+    def commit_notifications(self):
+        """
+        Build the yawns for all queued notifications, lay out the
+        stacks once and only then map the new yawns
+        """
+        pending, self.pending_notifications = self.pending_notifications, {}
+        self.yawns_to_map = []
+        try:
+            for info_dict in pending.values():
+                self.select_yawn_type(info_dict)
+        finally:
+            new_yawns, self.yawns_to_map = self.yawns_to_map, None
+        self.map_yawns(new_yawns)
+
+    def map_yawns(self, new_yawns):
+        """
+        Lay out the stacks once and map the new yawns
+        """
+        for yawn in new_yawns:
+            yawn.pending_map = True
+            yawn.adjust_size()
+        self.layout_yawns()
+        for yawn in new_yawns:
+            yawn.pending_map = False
+            yawn.map()
+        if new_yawns:
+            self.yawns_mapped.emit(len(new_yawns))
+        self.update_idle_timer()
+
+    def layout_yawns(self):
+        """
+        Position every yawn in a single pass over each stack
+        """
+        self.layout_scheduled = False
+        self.stack_layout.layout()
+
+    def schedule_layout(self):
+        """
+        Lay out the yawns once control gets back to the event loop,
+        so closing many at once only moves the rest once
+        """
+        if not self.layout_scheduled:
+            self.layout_scheduled = True
+            QTimer.singleShot(0, self.layout_yawns)
+
+    def reset_screens(self):
+        """
+        Place every yawn again after a screen got added or removed,
+        with a clone on each screen for the ones shown on all of them
+        """
+        for yawn_list in self.yawn_arrays.values():
+            for yawn in yawn_list:
+                yawn.reset_clones()
+        self.schedule_layout()
+
+    def show_yawn(self, yawn):
+        """
+        Show a new yawn, or leave it for the batch being committed to map
+        """
+        if self.yawns_to_map is not None:
+            self.yawns_to_map.append(yawn)
+        else:
+            yawn.show()
+
+    def yawn_closed(self, yawn):
+        """
+        A primary yawn got closed: keep it for reuse and let a
+        queued notification take its slot
+        """
+        self.pool.release(yawn)
+        self.schedule_promotion()
+        self.update_idle_timer()
+
+    def queue_overflow(self, yawn_class, info_dict):
+        """
+        Queue info_dict if its yawn type already has max-visible yawns.
+        Returns whether it was queued.
+        """
+        config = getattr(self.settings, yawn_class.section)
+        if len(self.yawn_arrays[yawn_class.__name__]) < max(1, config.max_visible):
+            return False
+
+        evicted = self.overflow.push(yawn_class.__name__, info_dict, config.max_queued)
+        for old in evicted:
+            # Closed as expired, it never made it to the screen
+            self.request_notification_closing.emit(
+                old["notification_id"], 1, old.get("sender_id", "")
+            )
+        self.update_overflow_yawn(yawn_class.__name__)
+        return True
+
+    def schedule_promotion(self):
+        if self.overflow and not self.promotion_scheduled:
+            self.promotion_scheduled = True
+            QTimer.singleShot(0, self.promote_overflow)
+
+    def promote_overflow(self):
+        """
+        Show the oldest queued notifications of each type while
+        there's room for them
+        """
+        self.promotion_scheduled = False
+        if self.yawns_to_map is not None:
+            self.schedule_promotion()
+            return
+
+        self.yawns_to_map = []
+        try:
+            for yawn_class, show in (
+                (CornerYawn, self.show_corner_yawn),
+                (CenterYawn, self.show_center_yawn),
+            ):
+                name = yawn_class.__name__
+                config = getattr(self.settings, yawn_class.section)
+                while len(self.yawn_arrays[name]) < max(1, config.max_visible):
+                    info_dict = self.overflow.pop(name)
+                    if info_dict is None:
+                        break
+                    # Don't show what expired while waiting
+                    expire_timeout = int(info_dict.get("expire_timeout", -1))
+                    waited = time.monotonic() - info_dict.pop("queued_at")
+                    if 0 < expire_timeout < waited * 1000:
+                        self.request_notification_closing.emit(
+                            info_dict["notification_id"],
+                            1,
+                            info_dict.get("sender_id", ""),
+                        )
+                        continue
+                    show(info_dict)
+                self.update_overflow_yawn(name)
+        finally:
+            new_yawns, self.yawns_to_map = self.yawns_to_map, None
+        self.map_yawns(new_yawns)
+
+    def update_overflow_yawn(self, yawn_class):
+        """
+        Show, update or hide the "+N more" yawn of a yawn type
+        """
+        # Only the corner stack has an end to put it at
+        if yawn_class != "CornerYawn":
+            return
+        count = self.overflow.count(yawn_class)
+        overflow_yawn = self.overflow_yawns.get(yawn_class, None)
+        if not count:
+            if overflow_yawn is not None and overflow_yawn.isVisible():
+                overflow_yawn.hide()
+            return
+
+        if overflow_yawn is None:
+            overflow_yawn = OverflowYawn(self, self.settings.corner, CornerYawn)
+            self.overflow_yawns[yawn_class] = overflow_yawn
+        overflow_yawn.set_count(count)
+        min_urgency = self.settings.corner.min_urgency
+        if self.fullscreen_detected and overflow_yawn.urgency < min_urgency:
+            overflow_yawn.hide()
+        elif overflow_yawn.isVisible():
+            self.schedule_layout()
+        else:
+            # Place it before it shows up
+            overflow_yawn.pending_map = True
+            self.layout_yawns()
+            overflow_yawn.pending_map = False
+            overflow_yawn.show()
+
+    def select_yawn_type(self, info_dict):
+        """
+        Select the yawn type based on the routing rules in the config
+        or the yawn_type hint in info dict
+        """
+        fallback = self.show_corner_yawn
+        yawn_type = None
+
+        if "yawn_type" in info_dict["hints"]:
+            yawn_type = int(info_dict["hints"]["yawn_type"].value)
+
+        # Routing rules from the config win over the hint
+        rule = self.router.route(info_dict)
+        if rule:
+            if rule.yawn_type:
+                yawn_type = rule.yawn_type
+            if rule.overrides:
+                info_dict["overrides"] = rule.overrides
+
+        if yawn_type == YawnType.CORNER.value:
+            self.show_corner_yawn(info_dict)
+        elif yawn_type == YawnType.CENTER.value:
+            self.show_center_yawn(info_dict)
+        elif yawn_type == YawnType.MEDIA.value:
+            self.show_media_yawn(info_dict)
+        else:
+            fallback(info_dict)
+
+        # Run command after showing the yawn
+        self.hooks.run(info_dict)
+
+    def _handle_replace(self, info_dict, target_type):
+        """
+        Handles notification replacement logic.
+        Returns True if the notification was handled (replaced or updated),
+        False if a new notification needs to be created.
+        """
+        # Replacements keep the id of the notification they replace
+        id = info_dict["notification_id"]
+        queued_type = self.overflow.type_of(id)
+        if queued_type == target_type:
+            self.overflow.replace(info_dict)
+            return True
+        if queued_type is not None:
+            self.overflow.remove(id)
+            self.update_overflow_yawn(queued_type)
+
+        yawn = self.registry.get(id)
+        if yawn is None:
+            return False
+
+        # A yawn of another type makes way for the new one
+        if yawn.yawn_class != target_type:
+            yawn.close()
+            return False
+
+        # Update in-place if same type
+        yawn.info_dict = info_dict
+        yawn.restart_timer()
+        yawn.update_content()
+        return True
+
+    def show_corner_yawn(self, info_dict):
+        if self._handle_replace(info_dict, "CornerYawn"):
+            return
+        if self.queue_overflow(CornerYawn, info_dict):
+            return
+
+        yawn = self.pool.acquire(CornerYawn, info_dict)
+        min_urgency = yawn.setting("min_urgency")
+        
+        should_hide = yawn.urgency < min_urgency and self.fullscreen_detected
+        if not should_hide:
+            self.show_yawn(yawn)
+
+    def show_center_yawn(self, info_dict):
+        if self._handle_replace(info_dict, "CenterYawn"):
+            return
+        if self.queue_overflow(CenterYawn, info_dict):
+            return
+
+        yawn = self.pool.acquire(CenterYawn, info_dict)
+        min_urgency = yawn.setting("min_urgency")
+        
+        should_hide = yawn.urgency < min_urgency and self.fullscreen_detected
+        if not should_hide:
+            self.show_yawn(yawn)
+
+    def show_media_yawn(self, info_dict):
+        # Media yawn is unique: it acts as a singleton, replacing the existing one
+        # regardless of ID if one exists, OR it respects the standard replace ID logic.
+        # The original code just checked if *any* MediaYawn existed.
+        queued_type = self.overflow.type_of(info_dict["notification_id"])
+        if queued_type is not None:
+            self.overflow.remove(info_dict["notification_id"])
+            self.update_overflow_yawn(queued_type)
+        replaced = self.registry.get(info_dict["notification_id"])
+        if replaced is not None and replaced.yawn_class != "MediaYawn":
+            replaced.close()
+        if self.yawn_arrays["MediaYawn"]:
+            notification = self.yawn_arrays["MediaYawn"][0]
+            old_info = notification.info_dict
+            self.registry.remove(notification)
+            notification.info_dict = info_dict
+            self.registry.add(notification)
+            notification.restart_timer()
+            notification.update_content()
+            # The notification it was showing is gone now, let its sender
+            # (and everything kept about it) know
+            if old_info["notification_id"] != info_dict["notification_id"]:
+                self.request_notification_closing.emit(
+                    old_info["notification_id"], 3, old_info.get("sender_id", "")
+                )
+            return
+
+        yawn = self.pool.acquire(MediaYawn, info_dict)
+        min_urgency = yawn.setting("min_urgency")
+        
+        should_hide = yawn.urgency < min_urgency and self.fullscreen_detected
+        if not should_hide:
+            self.show_yawn(yawn)
+
+    def close_notification(self, notification_id):
+        """
+        Close the notification with the given ID
+        """
+        # It might not have made it out of the queue yet
+        if self.pending_notifications.pop(notification_id, None) is not None:
+            return
+        queued_type = self.overflow.type_of(notification_id)
+        if queued_type is not None:
+            self.overflow.remove(notification_id)
+            self.update_overflow_yawn(queued_type)
+            self.update_idle_timer()
+            return
+        yawn = self.registry.get(notification_id)
+        if yawn is not None:
+            yawn.close()
+
+    def collect_stats(self):
+        """
+        Counters from the GUI side, reported through GetStats
+        """
+        return {
+            **self.pixmap_cache.stats(),
+            **self.hooks.stats(),
+            **self.registry.stats(),
+            **self.pool.stats(),
+            **self.stack_layout.stats(),
+            **self.overflow.stats(),
+            **self.animation_clock.stats(),
+            **self.media_compositor.stats(),
+        }
+
+    def set_notification_image(self, notification_id, img_byte_arr, img_key):
+        """
+        Hand a finished image to the yawn showing the given notification
+        """
+        notification = None
+        info_dict = self.pending_notifications.get(
+            notification_id, None
+        ) or self.overflow.get(notification_id)
+        if info_dict is None:
+            notification = self.registry.get(notification_id)
+            if notification is None:
+                return
+            info_dict = notification.info_dict
+        info_dict["img_byte_arr"] = img_byte_arr
+        info_dict["img_raw"] = None
+        info_dict["img_key"] = img_key
+        info_dict["image_pending"] = False
+        if notification is not None:
+            notification.update_content()
+            if notification.isVisible():
+                notification.adjust_size()
+                self.layout_yawns()
+
+    def bump_notification(self, notification_id, count):
+        """
+        Show the repeat count of a notification that got duplicates merged
+        into it and keep it on screen for longer
+        """
+        info_dict = self.pending_notifications.get(
+            notification_id, None
+        ) or self.overflow.get(notification_id)
+        if info_dict is not None:
+            info_dict["repeat_count"] = count
+            return
+        notification = self.registry.get(notification_id)
+        if notification is not None:
+            notification.info_dict["repeat_count"] = count
+            notification.restart_timer()
+            notification.update_text()
+            for clone in notification.clones:
+                clone.update_text()
+
+
+def connect_service(service, app):
+    """
+    Wire a NotificationService and the yawns app together
+    """
+    service.stats_provider = app.collect_stats
+    service.notification_received.connect(app.queue_notification)
+    service.image_received.connect(app.set_notification_image)
+    service.notification_repeated.connect(app.bump_notification)
+    app.request_notification_closing.connect(service.close_notification)
+    app.request_notification_action.connect(service.do_action_on_notification)
+    service.notification_closed.connect(app.close_notification)
+
+
+def create_integrated_loop(app):
+    """
+    Create an asyncio loop driven by the Qt event loop.
+    Returns None if qasync isn't available.
+    """
+    try:
+        import qasync
+    except ImportError:
+        print("qasync is not installed, falling back to a separate D-Bus thread")
+        return None
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    return loop
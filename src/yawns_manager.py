@@ -1,27 +1,54 @@
 import time
 import os
-from dbus_next.constants import MessageType
+import contextvars
+from dbus_next.constants import MessageType, NameFlag, RequestNameReply
 from dbus_next.service import ServiceInterface, method, dbus_property, signal
 from dbus_next.aio import MessageBus
 from dbus_next.message import Message
-from gtk_helpers import find_icon
-from PIL import Image
-import io
+from image_helpers import ImageDecoder, image_key, image_source, raw_image
+from admission import AdmissionControl, MERGE, DROP
+from history import NotificationHistory
 import asyncio
 
-from yawns_notifications import BaseYawn
+# Sender of the method call being handled. It's set right before
+# dbus-next dispatches the call and, being a context variable, it
+# follows the call into any task spawned while handling it
+current_sender = contextvars.ContextVar("current_sender", default="")
 
 
 class NotificationManager(ServiceInterface):
-    def __init__(self, bus):
+    def __init__(self, bus, config=None):
         super().__init__("org.freedesktop.Notifications")
         self.notification_id = 0
         self.bus = bus
-        self.current_sender = ""
+        general = config["general"] if config and "general" in config else {}
+        self.image_decoder = ImageDecoder(
+            workers=int(general.get("image-workers", 2)),
+            max_pending=int(general.get("image-queue-depth", 32)),
+        )
+        self.admission = AdmissionControl(config)
+        self.history = None
+        history_size = int(general.get("history-size", 200))
+        if history_size > 0:
+            history_file = general.get("history-file", None)
+            self.history = NotificationHistory(
+                os.path.expanduser(history_file) if history_file else None,
+                history_size,
+            )
+        # Owner (unique bus name) of every live notification, so closing
+        # and action signals always go back to the client that sent it
+        self.notification_senders = {}
+        # Image load still expected for a notification, so one finishing
+        # after its notification got replaced isn't shown on the new one
+        self.pending_images = {}
 
         def handle_message(message: Message):
-            """Handle incoming D-Bus messages and log the sender."""
-            self.current_sender = message.sender  # Save the sender somewhere
+            """Record the sender of incoming method calls."""
+            if (
+                message.message_type == MessageType.METHOD_CALL
+                and message.interface == "org.freedesktop.Notifications"
+            ):
+                current_sender.set(message.sender)
 
         self.bus.add_message_handler(handle_message)
 
@@ -46,108 +73,91 @@ class NotificationManager(ServiceInterface):
         expire_timeout: "i",
     ) -> "u":
 
-        def construct_image(image_data):
-            width = image_data[0]
-            height = image_data[1]
-            rowstride = image_data[2]
-            has_alpha = image_data[3]
-            bits_per_sample = image_data[4]
-            channels = image_data[5]
-            data = bytes(image_data[6])
-
-            # Allow RGBA images (used for discord pfps, haven't seen 
-            # them elsewhere)
-            mode = "RGBA" if has_alpha else "RGB"
-
-            image = Image.frombytes(
-                mode,
-                (width, height),
-                data,
-                "raw",
-                mode,
-                rowstride,
-            )
-
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format="PNG")
-            return img_byte_arr.getvalue()
+        sender = current_sender.get()
+        urgency = 1
+        if "urgency" in hints:
+            urgency = int(hints["urgency"].value)
 
-        # Load the image according to the freedesktop specification
-        # See here: https://specifications.freedesktop.org/notification-spec/1.2/icons-and-images.html#icons-and-images-formats
-        img_byte_arr = None
-        if "image-data" in hints:
-            try:
-                img_byte_arr = construct_image(hints["image-data"].value)
-            except Exception as e:
-                print(f"Error loading image: {e}")
+        # Replacements are updates to a live notification, everything
+        # else (including a replaces_id that's closed or was never
+        # handed out) goes through admission control first
+        if replaces_id not in self.notification_senders:
+            decision, live_id, count = self.admission.check(
+                sender, app_name, summary, body, urgency
+            )
+            if decision == MERGE:
+                self.notify_repeated(live_id, count)
+                return live_id
+            if decision == DROP:
+                self.notification_id += 1
+                self.close_notification(self.notification_id, 4, sender)
+                return self.notification_id
+        else:
+            self.admission.forget(replaces_id)
 
-        elif not img_byte_arr and "image-path" in hints:
-            image_path = hints["image-path"].value.replace("file://", "")
-            if os.path.exists(image_path):
-                try:
-                    with open(image_path, "rb") as img_file:
-                        img_byte_arr = img_file.read()
-                except Exception as e:
-                    print(f"Error opening image file: {e}")
-            else:
-                fd_icon = find_icon(image_path)
-                if fd_icon:
-                    try:
-                        with open(image_path, "rb") as img_file:
-                            img_byte_arr = img_file.read()
-                    except Exception as e:
-                        print(f"Error opening image file: {e}")
-                else:
-                    print(
-                        f"Provided image-path is neither a valid image or name in a freedesktop.org-compliant icon theme: {image_path}"
-                    )
-
-        elif not img_byte_arr and app_icon:
-            image_path = app_icon.replace("file://", "")
-            if os.path.exists(image_path):
-                try:
-                    with open(image_path, "rb") as img_file:
-                        img_byte_arr = img_file.read()
-                except Exception as e:
-                    print(f"Error opening image file: {e}")
-            else:
-                fd_icon = find_icon(image_path)
-                if fd_icon:
-                    try:
-                        with open(fd_icon, "rb") as img_file:
-                            img_byte_arr = img_file.read()
-                    except Exception as e:
-                        print(f"Error opening image file: {e}")
-                else:
-                    print(
-                        f"Provided app_icon is neither a valid image or name in a freedesktop.org-compliant icon theme: {image_path}"
-                    )
-
-        elif not img_byte_arr and "icon_data" in hints:
+        # Raw pixel hints are passed along as they are, only files
+        # need to go through the worker pool
+        source = image_source(app_icon, hints)
+        img_raw = None
+        img_key = ""
+        if source in ("image-data", "icon_data"):
             try:
-                img_byte_arr = construct_image(hints["icon_data"].value)
+                img_raw = raw_image(hints[source].value)
             except Exception as e:
                 print(f"Error loading image: {e}")
+            if img_raw:
+                img_key = image_key(img_raw["buffer"])
 
-        self.notification_id += 1
+        # As the spec requires, a replacement keeps the id it replaces.
+        # Only ids handed out before can be reused, so they never clash
+        # with one given to a new notification later
+        if 0 < replaces_id <= self.notification_id:
+            notification_id = replaces_id
+        else:
+            self.notification_id += 1
+            notification_id = self.notification_id
+        self.notification_senders[notification_id] = sender
+        self.pending_images.pop(notification_id, None)
         info_dict = {
             "app_name": app_name,
             "replaces_id": replaces_id,
-            "notification_id": self.notification_id,
+            "notification_id": notification_id,
             "app_icon": app_icon,
             "summary": summary,
             "body": body,
             "actions": actions,
             "hints": hints,
             "expire_timeout": expire_timeout,
-            "sender_id": self.current_sender,
-            "img_byte_arr": img_byte_arr,
+            "sender_id": sender,
+            "img_byte_arr": None,
+            "img_raw": img_raw,
+            "img_key": img_key,
+            "image_pending": source in ("image-path", "app_icon"),
         }
 
         # self.activate_notification(info_dict)
         self.notify_app(info_dict)
+        self.admission.register(notification_id, app_name, summary, body)
+        if self.history:
+            self.history.add(info_dict)
+
+        # Image files get loaded in the worker pool, the yawn picks
+        # them up once they're ready
+        if info_dict["image_pending"]:
+            request = object()
+            self.pending_images[notification_id] = request
+
+            def loaded(img_byte_arr, img_key):
+                if self.pending_images.get(notification_id, None) is request:
+                    del self.pending_images[notification_id]
+                    self.image_loaded(notification_id, img_byte_arr, img_key)
 
-        return self.notification_id  # Return the notification ID
+            if not self.image_decoder.submit(app_icon, hints, loaded):
+                del self.pending_images[notification_id]
+                print(f"Image queue full, dropping image for notification {notification_id}")
+                self.image_loaded(notification_id, None, "")
+
+        return notification_id  # Return the notification ID
 
     @method()
     def CloseNotification(self, id: "u"):
@@ -155,11 +165,58 @@ class NotificationManager(ServiceInterface):
         # but in theory the sender should be able to close
         # the notification by accessing this method
         # Edit: I am a fool, this does indeed get used quite a bit
-        self.close_notification(id, 3, self.current_sender)
+        sender = self.notification_senders.get(id, current_sender.get())
+        self.close_notification(id, 3, sender)
+
+    @method()
+    def GetHistory(self, offset: "u", limit: "u", app_filter: "s") -> "a(ussssyx)":
+        """
+        Recent notifications, newest first. Each entry is
+        (id, app_name, summary, body, app_icon, urgency, unix time in ms)
+        """
+        if not self.history:
+            return []
+        return [
+            [
+                record["id"],
+                record["app_name"],
+                record["summary"],
+                record["body"],
+                record["app_icon"],
+                record["urgency"],
+                int(record["time"] * 1000),
+            ]
+            for record in self.history.query(offset, limit, app_filter)
+        ]
+
+    @method()
+    def GetStats(self) -> "a{su}":
+        stats = self.image_decoder.stats()
+        stats.update(self.admission.stats())
+        stats.update(self.app_stats())
+        return stats
+
+    def forget_notification(self, id):
+        """
+        Drop everything kept about a notification once it's closed.
+        Must be called from the D-Bus loop.
+        """
+        self.notification_senders.pop(id, None)
+        self.pending_images.pop(id, None)
+        self.admission.forget(id)
 
     def notify_app(self, info_dict):
         pass
 
+    def image_loaded(self, id, img_byte_arr, img_key):
+        pass
+
+    def notify_repeated(self, id, count):
+        pass
+
+    def app_stats(self):
+        return {}
+
     def close_notification(self, id, reason, sender_id):
         pass
 
@@ -167,6 +224,27 @@ class NotificationManager(ServiceInterface):
         pass
 
 
+async def acquire_service(config=None):
+    """
+    Connect to the session bus, export a NotificationManager and take
+    org.freedesktop.Notifications, all on a single connection.
+    The manager is exported first so no call can arrive before it.
+    Returns (bus, manager), or (None, None) if another notification
+    service already owns the name.
+    """
+    bus = await MessageBus().connect()
+    manager = NotificationManager(bus, config)
+    bus.export("/org/freedesktop/Notifications", manager)
+    reply = await bus.request_name(
+        "org.freedesktop.Notifications", NameFlag.DO_NOT_QUEUE
+    )
+    if reply != RequestNameReply.PRIMARY_OWNER:
+        manager.image_decoder.shutdown()
+        bus.disconnect()
+        return None, None
+    return bus, manager
+
+
 async def main():
     bus = await MessageBus().connect()
     daemon = NotificationManager(bus)
@@ -1,5 +1,4 @@
 import os
-import cssutils
 from PyQt5.QtWidgets import (
     QProgressBar,
     QHBoxLayout,
@@ -9,9 +8,10 @@ from PyQt5.QtWidgets import (
     QWidget,
     QLabel,
     QFrame,
+    QStyle,
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QPainter, QPainterPath, QPixmap, QCursor
+from PyQt5.QtCore import Qt, QPoint, QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QImage, QCursor
 from enum import Enum
 
 
@@ -21,16 +21,88 @@ class YawnType(Enum):
     MEDIA = 3
 
 
+class SpinningLabel(QLabel):
+    """
+    QLabel that paints its pixmap turned by `angle` degrees.
+    Spinning it only schedules a repaint, the pixmap and the
+    label's size are left alone, so nothing gets laid out again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.angle = 0
+
+    def rotate(self, angle_increment):
+        self.angle = (self.angle + angle_increment) % 360
+        self.update()
+
+    def paintEvent(self, event):
+        pixmap = self.pixmap()
+        if pixmap is None or pixmap.isNull():
+            return super().paintEvent(event)
+
+        painter = QPainter(self)
+        # Background and border from the stylesheet
+        self.drawFrame(painter)
+        size = pixmap.size() / pixmap.devicePixelRatioF()
+        rect = QStyle.alignedRect(
+            self.layoutDirection(), self.alignment(), size, self.contentsRect()
+        )
+        center = rect.center()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.translate(center.x() + 1, center.y() + 1)
+        painter.rotate(self.angle)
+        painter.translate(-center.x() - 1, -center.y() - 1)
+        painter.drawPixmap(rect, pixmap)
+        painter.end()
+
+
+def get_urgency(info_dict):
+    urgency_struct = info_dict["hints"].get("urgency", None)
+    return int(urgency_struct.value) if urgency_struct else 1
+
+
+def load_icon_image(info_dict):
+    """
+    Build a QImage for the notification image in info_dict.
+    Raw pixel buffers are wrapped as they are, without going
+    through any codec. Returns None if there's no usable image.
+    """
+    img_raw = info_dict.get("img_raw", None)
+    if img_raw:
+        image_format = (
+            QImage.Format_RGBA8888 if img_raw["channels"] == 4 else QImage.Format_RGB888
+        )
+        image = QImage(
+            img_raw["buffer"],
+            img_raw["width"],
+            img_raw["height"],
+            img_raw["rowstride"],
+            image_format,
+        )
+    elif info_dict.get("img_byte_arr", None):
+        image = QImage()
+        image.loadFromData(info_dict["img_byte_arr"])
+    else:
+        return None
+
+    if image.isNull():
+        return None
+    return image
+
+
 class BaseYawn(QWidget):
     """Base class for all notification widgets"""
 
     yawn_activated = pyqtSignal(int)
+    icon_label_type = QLabel
 
     def __init__(
         self,
         app,
         config,
-        info_dict,
+        info_dict=None,
         parent=None,
         _clone_for_screen=None,
         _primary=None,
@@ -43,14 +115,19 @@ class BaseYawn(QWidget):
         self.is_clone = _clone_for_screen is not None
         self.primary = _primary
         self.clones = []
+        # What each part of the yawn currently shows, see changed()
+        self.shown = {}
+        self.action_buttons = []
+        self.close_button = None
 
-        if "general" in config:
-            self.general_config = config["general"]
-        else:
-            self.general_config = {}
+        self.general_config = config.general
 
         self.app = app
         self.info_dict = info_dict
+        # Screen the yawn was placed on, see get_target_screen
+        self.target_screen = None
+        # Set while the yawn waits to be mapped in a batch
+        self.pending_map = False
         self.setAttribute(Qt.WA_TranslucentBackground)
         
         # Only the primary yawn manages the close timer
@@ -65,20 +142,54 @@ class BaseYawn(QWidget):
         else:
             self.timer = None
 
-        urgency_struct = self.info_dict["hints"].get("urgency", None)
-        self.urgency = 1
-        if urgency_struct:
-            self.urgency = int(urgency_struct.value)
-
+        self.urgency = get_urgency(info_dict) if info_dict else 1
         self.app.setup_yawn_window(self)
+        # Urgency the window properties were set up for
+        self.window_urgency = self.urgency
+
+    def bind(self, info_dict):
+        """
+        Make this yawn show the given notification. Yawns built without
+        one (kept in the pool) only become live through this.
+        """
+        self.info_dict = info_dict
+        self.urgency = get_urgency(info_dict)
+        if self.urgency != self.window_urgency:
+            self.app.setup_yawn_window(self)
+            self.window_urgency = self.urgency
+        if not self.is_clone:
+            self.app.registry.add(self)
+            self.app.yawn_arrays[self.yawn_class].append(self)
+        self.target_screen = None
+        self.restart_timer()
+        self.update_content()
+
+    def reset(self):
+        """
+        Stop everything running for the notification shown,
+        before the yawn goes back to the pool
+        """
+        if self.timer:
+            self.timer.stop()
+        self.pending_map = False
+        self.target_screen = None
+        self.shown.clear()
 
     def get_target_screen(self):
-        """Resolve which QScreen to use based on config or clone status."""
+        """
+        The QScreen the yawn goes on. It's resolved once per notification,
+        so a yawn placed on the focused screen stays there.
+        """
         # If this is a clone, it is assigned a specific screen
         if self._clone_for_screen:
             return self._clone_for_screen
+        if self.target_screen is None:
+            self.target_screen = self.resolve_target_screen()
+        return self.target_screen
 
-        monitor = self.config.get("monitor", "primary")
+    def resolve_target_screen(self):
+        """Resolve which QScreen to use based on config."""
+        monitor = self.config.monitor
         screens = self.app.screens()
 
         # If configured for "all" or "-1", the PRIMARY yawn goes to the primary screen.
@@ -108,7 +219,7 @@ class BaseYawn(QWidget):
 
     def _should_clone(self):
         """Check if we should spawn clones."""
-        monitor = str(self.config.get("monitor", "primary")).lower()
+        monitor = self.config.monitor.lower()
         return not self.is_clone and monitor in ["all", "-1"]
 
     def _spawn_clones(self):
@@ -121,10 +232,14 @@ class BaseYawn(QWidget):
             if screen != primary_screen:
                 try:
                     clone = self._create_clone(screen)
+                    clone.adjust_size()
                     self.clones.append(clone)
-                    clone.show()
                 except NotImplementedError:
                     print(f"Cloning not implemented for {self.yawn_class}")
+        if self.clones:
+            self.app.layout_yawns()
+            for clone in self.clones:
+                clone.map()
 
     def _create_clone(self, screen):
         """Factory method to be implemented by subclasses."""
@@ -133,15 +248,125 @@ class BaseYawn(QWidget):
     def _update_clones(self):
         """Propagate content updates to clones."""
         for clone in self.clones:
-            clone.info_dict = self.info_dict
-            clone.update_content()
+            clone.sync_from_primary()
+
+    def sync_from_primary(self):
+        """
+        Show the primary's content on this clone. What the primary
+        already decoded and measured (icon pixmap, text width) is
+        taken as is instead of being worked out again.
+        """
+        primary = self.primary
+        self.info_dict = primary.info_dict
+        self.sync_icon()
+        self.text_container.setMinimumWidth(primary.text_container.minimumWidth())
+        self.text_container.setMaximumWidth(primary.text_container.maximumWidth())
+        self.update_text()
+        self.update_bar()
+        self.update_buttons()
+
+    def sync_icon(self):
+        self.icon_size = self.primary.icon_size
+        pixmap = self.primary.icon_label.pixmap()
+        if pixmap is not None and pixmap.isNull():
+            pixmap = None
+        if not self.changed("icon", pixmap and pixmap.cacheKey()):
+            return
+        if pixmap is not None:
+            self.icon_label.setPixmap(pixmap)
+            self.icon_label.setMinimumSize(0, 0)
+            self.icon_label.setMaximumSize(100000, 100000)
+        else:
+            self.icon_label.clear()
+            self.icon_label.setFixedSize(0, 0)
             
+    def changed(self, part, state):
+        """
+        Whether part of the yawn has to be updated to show state.
+        state holds everything the part is built from, and is
+        remembered as shown once this returns True.
+        """
+        if part in self.shown and self.shown[part] == state:
+            return False
+        self.shown[part] = state
+        return True
+
+    def setting(self, name):
+        """
+        A setting from the yawn type's config section,
+        unless the routing rule that picked this yawn overrides it
+        """
+        overrides = self.info_dict.get("overrides", None)
+        if overrides and name in overrides:
+            return overrides[name]
+        return getattr(self.config, name)
+
+    def apply_settings(self, settings):
+        """
+        Switch to a new settings snapshot and re-apply it
+        """
+        self._full_config = settings
+        self.general_config = settings.general
+        self.config = getattr(settings, self.section)
+        self.target_screen = None
+        self.shown.clear()
+        self.apply_size()
+        self.update_content()
+        for clone in self.clones:
+            clone.apply_settings(settings)
+
+    def apply_size(self):
+        pass
+
     def _close_clones(self):
         """Close all associated clones."""
         for clone in self.clones:
             clone.close()
         self.clones.clear()
 
+    def reset_clones(self):
+        """
+        Match the clones to the screens after one got added or
+        removed: clones on screens that are gone (or that the primary
+        moved to) are closed, new screens get one.
+        """
+        if self.is_clone:
+            return
+        self.target_screen = None
+        primary_screen = self.get_target_screen()
+        screens = self.app.screens() if self._should_clone() else []
+        kept = []
+        covered = set()
+        for clone in self.clones:
+            screen = clone.get_target_screen()
+            if screen in screens and screen != primary_screen and screen not in covered:
+                kept.append(clone)
+                covered.add(screen)
+            else:
+                clone.close()
+        self.clones = kept
+
+        for screen in screens:
+            if screen == primary_screen or screen in covered:
+                continue
+            try:
+                clone = self._create_clone(screen)
+            except NotImplementedError:
+                print(f"Cloning not implemented for {self.yawn_class}")
+                return
+            clone.adjust_size()
+            self.clones.append(clone)
+            if self.isVisible():
+                clone.map()
+
+    def close(self):
+        if not self.is_clone:
+            self.app.registry.remove(self)
+        result = super().close()
+        if not self.is_clone:
+            self.app.yawn_closed(self)
+        return result
+
     def setup_widgets(self):
         """
         Setup all needed widgets for the yawn
@@ -155,7 +380,7 @@ class BaseYawn(QWidget):
         self.main_widget.setObjectName(self.yawn_class)
         self.main_container_layout.addWidget(self.main_widget)
 
-        self.icon_label = QLabel()
+        self.icon_label = self.icon_label_type()
         self.icon_label.setObjectName(self.yawn_class + "Icon")
 
         self.summary_label = QLabel()
@@ -224,7 +449,7 @@ class BaseYawn(QWidget):
 
         if self.timer.isActive():
             self.timer.stop()
-        timeout = int(self.config.get("timeout", 5250))
+        timeout = self.setting("timeout")
         if (
             "expire_timeout" in self.info_dict
             and int(self.info_dict["expire_timeout"]) > 0
@@ -233,27 +458,71 @@ class BaseYawn(QWidget):
         self.timer.setInterval(timeout)
         self.timer.start()
 
+    def cached_pixmap(self, variant, render):
+        """
+        Get the pixmap for the notification image from the shared pixmap
+        cache. On a miss the image is decoded and render(image) builds the
+        pixmap. variant holds everything besides the image content that
+        changes the rendered result.
+        Returns None if there's no usable image.
+        """
+        img_key = self.info_dict.get("img_key", None)
+        cache_key = (img_key, *variant)
+        if img_key:
+            pixmap = self.app.pixmap_cache.get(cache_key)
+            if pixmap is not None:
+                return pixmap
+
+        image = load_icon_image(self.info_dict)
+        if image is None:
+            return None
+        pixmap = render(image)
+        if img_key:
+            self.app.pixmap_cache.put(cache_key, pixmap)
+        return pixmap
+
     def update_icon(self):
         """
         Updates the icon widget
         """
-        self.icon_size = 0
-        if self.info_dict.get("img_byte_arr", None):
-            image_pixmap = QPixmap()
-            if image_pixmap.loadFromData(self.info_dict["img_byte_arr"]):
-                self.icon_size = int(self.config.get("icon-size", 64))
-                image_pixmap = image_pixmap.scaled(
-                    self.icon_size,
-                    self.icon_size,
+        icon_size = self.setting("icon_size")
+        dpr = self.devicePixelRatioF()
+
+        def render(image):
+            image_pixmap = QPixmap.fromImage(
+                image.scaled(
+                    round(icon_size * dpr),
+                    round(icon_size * dpr),
                     Qt.KeepAspectRatio,
                     Qt.SmoothTransformation,
                 )
-                self.icon_label.setPixmap(image_pixmap)
-                self.icon_label.setMinimumSize(0, 0)
-                self.icon_label.setMaximumSize(100000, 100000)
-            else:
-                self.icon_label.clear()
-                self.icon_label.setFixedSize(0, 0)
+            )
+            image_pixmap.setDevicePixelRatio(dpr)
+            return image_pixmap
+
+        has_image = bool(
+            self.info_dict.get("img_raw", None)
+            or self.info_dict.get("img_byte_arr", None)
+        )
+        # A replacement whose image is still loading keeps showing
+        # the current icon until the new image gets here
+        if self.info_dict.get("image_pending", False) and "icon" in self.shown:
+            return
+        image = (
+            self.info_dict.get("img_key", None),
+            self.info_dict.get("app_icon", ""),
+            has_image,
+        )
+        if not self.changed("icon", (image, icon_size, dpr)):
+            return
+
+        self.icon_size = 0
+        image_pixmap = self.cached_pixmap(("icon", icon_size, dpr), render)
+        if image_pixmap is not None:
+            self.icon_size = icon_size
+            self.icon_label.setPixmap(image_pixmap)
+            self.icon_label.setMinimumSize(0, 0)
+            self.icon_label.setMaximumSize(100000, 100000)
         else:
             self.icon_label.clear()
             self.icon_label.setFixedSize(0, 0)
@@ -262,8 +531,16 @@ class BaseYawn(QWidget):
         """
         Updates both the summary and body label
         """
-        if "summary" in self.info_dict and self.info_dict["summary"]:
-            text = self.info_dict["summary"].replace("\n", "<br>")
+        summary = self.info_dict.get("summary", None)
+        body = self.info_dict.get("body", None)
+        repeat_count = self.info_dict.get("repeat_count", 1)
+        if not self.changed("text", (summary, body, repeat_count)):
+            return
+
+        if summary:
+            text = summary.replace("\n", "<br>")
+            if repeat_count > 1:
+                text += f" (×{repeat_count})"
             self.summary_label.setText(text)
             self.summary_label.setMinimumSize(0, 0)
             self.summary_label.setMaximumSize(100000, 100000)
@@ -271,8 +548,8 @@ class BaseYawn(QWidget):
             self.summary_label.clear()
             self.summary_label.setFixedSize(0, 0)
 
-        if "body" in self.info_dict and self.info_dict["body"]:
-            text = self.info_dict["body"].replace("\n", "<br>")
+        if body:
+            text = body.replace("\n", "<br>")
             self.body_label.setText(text)
             self.body_label.setMinimumSize(0, 0)
             self.body_label.setMaximumSize(100000, 100000)
@@ -284,9 +561,14 @@ class BaseYawn(QWidget):
         """
         Updates the bar widget
         """
+        value = None
         if "value" in self.info_dict["hints"] and self.info_dict["hints"]["value"]:
             value = int(self.info_dict["hints"]["value"].value)
             value = min(100, max(0, value))
+        if not self.changed("bar", value):
+            return
+
+        if value is not None:
             self.bar.setValue(value)
             self.bar.setMinimumSize(0, 0)
             self.bar.setMaximumSize(100000, 100000)
@@ -296,44 +578,45 @@ class BaseYawn(QWidget):
 
     def update_buttons(self):
         """
-        Updates the action buttons
+        Updates the action buttons, reusing the ones already built
         """
+        actions = self.info_dict.get("actions", None) or []
+        if not (actions and self.config.show_buttons):
+            actions = []
+        if not self.changed("buttons", tuple(actions)):
+            return
 
-        def empty_layout(layout):
-            # Empties a layout recursively
-            while layout.count():
-                to_delete = layout.itemAt(0)
-                if to_delete is not None:
-                    child_layout = to_delete.layout()
-                    if child_layout is not None:
-                        empty_layout(child_layout)
-                    child_widget = to_delete.widget()
-                    if child_widget is not None:
-                        child_widget.deleteLater()
-                    layout.removeItem(to_delete)
+        if not actions:
+            self.buttons_container.setFixedSize(0, 0)
+            return
 
-        # Delete the current buttons before adding the new ones
-        empty_layout(self.buttons_layout)
-        if (
-            "actions" in self.info_dict
-            and self.info_dict["actions"]
-            and self.config.get("show_buttons", "false") == "true"
-        ):
-            actions = self.info_dict["actions"]
-            for action_index in range(1, len(actions), 2):
-                action_text = actions[action_index]
-                action = actions[action_index - 1]
-                action_button = QPushButton(action_text)
-                action_button.setCursor(Qt.PointingHandCursor)
-                action_button.setObjectName(self.yawn_class + "ActionButton")
-                action_button.clicked.connect(
-                    lambda _, act=action: self.action_clicked(act)
-                )
-                self.buttons_layout.addWidget(action_button)
-            close_button = QPushButton("Close")
-            close_button.setObjectName(self.yawn_class + "CloseButton")
-            close_button.setCursor(Qt.PointingHandCursor)
-            close_button.clicked.connect(
+        pairs = [
+            (actions[action_index - 1], actions[action_index])
+            for action_index in range(1, len(actions), 2)
+        ]
+        while len(self.action_buttons) < len(pairs):
+            action_button = QPushButton()
+            action_button.setCursor(Qt.PointingHandCursor)
+            action_button.setObjectName(self.yawn_class + "ActionButton")
+            action_button.clicked.connect(
+                lambda _, button=action_button: self.action_clicked(button.action)
+            )
+            # Before the close button
+            self.buttons_layout.insertWidget(len(self.action_buttons), action_button)
+            self.action_buttons.append(action_button)
+        while len(self.action_buttons) > len(pairs):
+            action_button = self.action_buttons.pop()
+            self.buttons_layout.removeWidget(action_button)
+            action_button.deleteLater()
+        for action_button, (action, action_text) in zip(self.action_buttons, pairs):
+            action_button.action = action
+            action_button.setText(action_text)
+
+        if self.close_button is None:
+            self.close_button = QPushButton("Close")
+            self.close_button.setObjectName(self.yawn_class + "CloseButton")
+            self.close_button.setCursor(Qt.PointingHandCursor)
+            self.close_button.clicked.connect(
                 lambda: (
                     self.app.request_notification_closing.emit(
                         self.info_dict["notification_id"],
@@ -342,128 +625,54 @@ class BaseYawn(QWidget):
                     )
                 )
             )
-            self.buttons_layout.addWidget(close_button)
-        else:
-            self.buttons_container.setFixedSize(0, 0)
+            self.buttons_layout.addWidget(self.close_button)
+        self.buttons_container.setMinimumSize(0, 0)
+        self.buttons_container.setMaximumSize(100000, 100000)
 
     def calculate_text_container_width(self, window_selector, icon_selector):
         """
-        Calculates the available width for the text container by parsing the
-        stylesheet.
-        """
-        # Parse the application stylesheet
-        stylesheet = cssutils.parseString(self.app.stylesheet)
-
-        # Helper function to expand shorthand properties
-        def expand_shorthand(styles, property_name):
-            if property_name in styles:
-                values = styles[property_name].split()
-                if len(values) == 1:  # All sides same
-                    styles.update(
-                        {
-                            f"{property_name}-top": values[0],
-                            f"{property_name}-right": values[0],
-                            f"{property_name}-bottom": values[0],
-                            f"{property_name}-left": values[0],
-                        }
-                    )
-                elif len(values) == 2:  # Vertical | Horizontal
-                    styles.update(
-                        {
-                            f"{property_name}-top": values[0],
-                            f"{property_name}-bottom": values[0],
-                            f"{property_name}-right": values[1],
-                            f"{property_name}-left": values[1],
-                        }
-                    )
-                elif len(values) == 3:  # Top | Horizontal | Bottom
-                    styles.update(
-                        {
-                            f"{property_name}-top": values[0],
-                            f"{property_name}-right": values[1],
-                            f"{property_name}-left": values[1],
-                            f"{property_name}-bottom": values[2],
-                        }
-                    )
-                elif len(values) == 4:  # Top | Right | Bottom | Left
-                    styles.update(
-                        {
-                            f"{property_name}-top": values[0],
-                            f"{property_name}-right": values[1],
-                            f"{property_name}-bottom": values[2],
-                            f"{property_name}-left": values[3],
-                        }
-                    )
-                del styles[property_name]
-            return styles
-
-        # Helper function to extract styles for a specific selector
-        def get_styles(selector, properties):
-            styles = {}
-            for rule in stylesheet:
-                if (
-                    rule.type == rule.STYLE_RULE
-                    and rule.selectorText.strip() == selector
-                ):
-                    for prop in rule.style:
-                        if prop.name in properties or any(
-                            prop.name.startswith(p) for p in properties
-                        ):
-                            styles[prop.name] = prop.value
-
-            # Expand shorthand properties
-            styles = expand_shorthand(styles, "margin")
-            styles = expand_shorthand(styles, "padding")
-            return styles
-
-        def px(val):
-            return int(val.replace("px", "")) if val else 0
-
-        # Extract relevant styles
-        window_styles = get_styles(window_selector, {"border", "margin", "padding"})
-        icon_styles = get_styles(icon_selector, {"border", "margin", "padding"})
-
-        # Resolve shorthand and defaults for window styles
-        window_border = px(window_styles.get("border", "0").split()[0])
-        window_padding_left = px(window_styles.get("padding-left", "0"))
-        window_padding_right = px(window_styles.get("padding-right", "0"))
-        total_horizontal_window_padding = window_padding_left + window_padding_right
-
-        # Resolve shorthand and defaults for icon styles
-        icon_margin_left = px(icon_styles.get("margin-left", "0"))
-        icon_margin_right = px(icon_styles.get("margin-right", "0"))
-        icon_padding_left = px(icon_styles.get("padding-left", "0"))
-        icon_padding_right = px(icon_styles.get("padding-right", "0"))
-        icon_border = px(icon_styles.get("border", "0").split()[0])
+        Calculates the available width for the text container from the
+        box metrics of the stylesheet.
+        """
+        window = self.app.style_metrics.box(window_selector)
+        icon = self.app.style_metrics.box(icon_selector)
 
         total_horizontal_icon_margin = (
-            icon_margin_left
-            + icon_margin_right
-            + icon_padding_left
-            + icon_padding_right
+            icon.margin_left + icon.margin_right + icon.padding_left + icon.padding_right
         )
 
         # Calculate layout width
         return (
             self.width()
-            - 2 * window_border
-            - total_horizontal_window_padding
+            - 2 * window.border
+            - window.padding_left
+            - window.padding_right
             - self.icon_size
-            + 2 * icon_border
+            + 2 * icon.border
             - (total_horizontal_icon_margin if self.icon_size else 0)
         )
 
+    def update_text_width(self):
+        """
+        Fit the text container next to the icon,
+        for the yawn types laying them out side by side
+        """
+        pass
+
     def update_content(self):
         """
-        Update the content of the yawn using its info_dict
+        Update the content of the yawn using its info_dict. Only the
+        parts whose data changed since the last update are touched.
         """
-        self.restart_timer()
+        if self.is_clone:
+            self.sync_from_primary()
+            return
         self.update_icon()
+        self.update_text_width()
         self.update_text()
         self.update_bar()
         self.update_buttons()
-        if not self.is_clone:
-            self._update_clones()
+        self._update_clones()
 
     def action_clicked(self, action):
         """
@@ -480,22 +689,52 @@ class BaseYawn(QWidget):
 
     def show(self):
         self.adjust_size()
-        self.update_position()
+        self.pending_map = True
+        self.app.layout_yawns()
+        self.pending_map = False
+        self.map()
+
+    def map(self):
+        """
+        Show the already sized and positioned yawn (and its clones)
+        """
         super().show()
-        self.next_update_position()
-        if not self.is_clone:
+        if self.is_clone:
+            return
+        if self.clones:
+            for clone in self.clones:
+                clone.map()
+        else:
             self._spawn_clones()
 
     def adjust_size(self):
-        self.main_layout.update()
+        if self.is_clone:
+            # Same content and width as the primary, same size
+            self.resize(self.primary.size())
+            return
+        # Lay out now, an image that arrived late would otherwise
+        # only be accounted for after the yawn was sized and placed
+        self.main_layout.activate()
         self.updateGeometry()
         self.adjustSize()
+        for clone in self.clones:
+            clone.adjust_size()
 
-    def update_position(self):
-        pass
+    def stack_position(self, geo, stack_offset):
+        """
+        Top left corner for the yawn on a screen with geometry geo,
+        stack_offset being the space taken by the yawns stacked before it
+        """
+        return QPoint(
+            geo.x() + (geo.width() - self.width()) // 2,
+            geo.y() + (geo.height() - self.height()) // 2,
+        )
 
-    def next_update_position(self):
-        pass
+    def stack_height(self):
+        """
+        Space this yawn takes in its stack, only corner yawns stack
+        """
+        return 0
 
     def mousePressEvent(self, a0):
         super().mousePressEvent(a0)
@@ -518,27 +757,26 @@ class BaseYawn(QWidget):
                 )
 
         if a0.button() == Qt.LeftButton:
-            do_actions(self.general_config.get("mouse-left-click", "close"))
+            do_actions(self.general_config.mouse_left_click)
         elif a0.button() == Qt.RightButton:
-            do_actions(self.general_config.get("mouse-right-click", "close"))
+            do_actions(self.general_config.mouse_right_click)
         elif a0.button() == Qt.MiddleButton:
-            do_actions(self.general_config.get("mouse-middle-click", "close"))
+            do_actions(self.general_config.mouse_middle_click)
 
 
 class CornerYawn(BaseYawn):
+    section = "corner"
+
     def __init__(
         self,
         app,
         config,
-        info_dict,
+        info_dict=None,
         parent=None,
         _clone_for_screen=None,
         _primary=None,
     ):
-        if "corner" in config:
-            self.config = config["corner"]
-        else:
-            self.config = {}
+        self.config = config.corner
         # Keep reference to full config for cloning
         self._full_config = config
         self.wm_class = "corner - yawn"
@@ -550,19 +788,17 @@ class CornerYawn(BaseYawn):
             _clone_for_screen=_clone_for_screen,
             _primary=_primary,
         )
-        self.setFixedWidth(int(self.config.get("width", 400)))
-        self.setMaximumHeight(int(self.config.get("height", 500)))
-        
-        if not self.is_clone:
-            self.index = len(app.yawn_arrays["CornerYawn"])
-            app.yawn_arrays[self.yawn_class].append(self)
-        else:
-            self.index = -1
+        self.apply_size()
 
         self.setWindowTitle("yawns - Corner")
         self.setup_widgets()
         self.setup_side_icon_layout()
-        self.update_content()
+        if info_dict is not None:
+            self.bind(info_dict)
+
+    def apply_size(self):
+        self.setFixedWidth(self.config.width)
+        self.setMaximumHeight(self.config.height)
 
     def _create_clone(self, screen):
         return CornerYawn(
@@ -573,103 +809,57 @@ class CornerYawn(BaseYawn):
             _primary=self,
         )
 
-    def update_content(self):
-        self.restart_timer()
-        self.update_icon()
-
-        layout_remaining_width = self.calculate_text_container_width(
-            "#CornerYawn", "#CornerYawnIcon"
+    def update_text_width(self):
+        self.text_container.setFixedWidth(
+            self.calculate_text_container_width("#CornerYawn", "#CornerYawnIcon")
         )
-        self.text_container.setFixedWidth(layout_remaining_width)
 
-        self.update_text()
-        self.update_bar()
-        self.update_buttons()
-        
-        if not self.is_clone:
-            self._update_clones()
-
-    def update_position(self):
-        # Mirror position from primary if this is a clone
-        if self.is_clone and self.primary:
-            p_screen = self.primary.get_target_screen()
-            p_geo = p_screen.geometry()
-            m_geo = self.get_target_screen().geometry()
-            
-            # Calculate relative position
-            rel_x = self.primary.x() - p_geo.x()
-            rel_y = self.primary.y() - p_geo.y()
-            
-            self.move(m_geo.x() + rel_x, m_geo.y() + rel_y)
-            return
+    def stack_height(self):
+        """
+        Space this yawn takes in the stack, including the gap after it
+        """
+        if self.isVisible() or self.pending_map:
+            return self.height() + self.config.gap
+        return 0
 
-        offset_x = int(self.config.get("x-offset", -40))
-        offset_y = int(self.config.get("y-offset", -40))
-        corner_width = self.width()
-        corner_height = self.height()
-        gap = int(self.config.get("gap", 10))
-        stacking_direction = 1
-        screen = self.get_target_screen()
-        geo = screen.geometry()
+    def stack_position(self, geo, stack_offset):
+        offset_x = self.config.x_offset
+        offset_y = self.config.y_offset
 
         if offset_x < 0:
-            offset_x = geo.x() + geo.width() + offset_x - corner_width
+            offset_x = geo.x() + geo.width() + offset_x - self.width()
         else:
             offset_x = geo.x() + offset_x
 
+        # Stack upwards from the bottom, or downwards from the top
         if offset_y < 0:
-            offset_y = geo.y() + geo.height() + offset_y - corner_height
-            stacking_direction = -1
+            offset_y = geo.y() + geo.height() + offset_y - self.height() - stack_offset
         else:
-            offset_y = geo.y() + offset_y
-
-        # Only count other PRIMARIES for stacking, not clones
-        yawns_under_self = len(self.app.yawn_arrays["CornerYawn"]) - self.index - 1
-        for i in range(yawns_under_self):
-            if self.app.yawn_arrays["CornerYawn"][self.index + i + 1].isVisible():
-                offset_y += (
-                    self.app.yawn_arrays["CornerYawn"][self.index + i + 1].height()
-                    + gap
-                ) * stacking_direction
-
-        self.move(offset_x, offset_y)
-        
-        # After moving, update clones
-        if not self.is_clone:
-            for clone in self.clones:
-                clone.update_position()
+            offset_y = geo.y() + offset_y + stack_offset
 
-    def next_update_position(self):
-        if not self.is_clone and self.index > 0:
-            self.app.yawn_arrays["CornerYawn"][self.index - 1].update_position()
-            self.app.yawn_arrays["CornerYawn"][self.index - 1].next_update_position()
+        return QPoint(offset_x, offset_y)
 
     def close(self):
         self._close_clones()
         if not self.is_clone and self in self.app.yawn_arrays["CornerYawn"]:
             self.app.yawn_arrays["CornerYawn"].remove(self)
-            for index in range(len(self.app.yawn_arrays["CornerYawn"])):
-                self.app.yawn_arrays["CornerYawn"][index].index = index
-            if self.app.yawn_arrays["CornerYawn"]:
-                self.app.yawn_arrays["CornerYawn"][-1].update_position()
-                self.app.yawn_arrays["CornerYawn"][-1].next_update_position()
+            self.app.schedule_layout()
         return super().close()
 
 
 class CenterYawn(BaseYawn):
+    section = "center"
+
     def __init__(
         self,
         app,
         config,
-        info_dict,
+        info_dict=None,
         parent=None,
         _clone_for_screen=None,
         _primary=None,
     ):
-        if "center" in config:
-            self.config = config["center"]
-        else:
-            self.config = {}
+        self.config = config.center
         self._full_config = config
         self.wm_class = "center - yawn"
         super().__init__(
@@ -681,17 +871,10 @@ class CenterYawn(BaseYawn):
             _primary=_primary,
         )
 
-        if not self.is_clone:
-            self.index = len(app.yawn_arrays["CenterYawn"])
-            app.yawn_arrays[self.yawn_class].append(self)
-        else:
-            self.index = -1
-
         self.setWindowTitle("yawns - Center")
         self.setup_widgets()
 
-        self.main_widget.setMinimumWidth(int(self.config.get("width", 220)))
-        self.main_widget.setMaximumHeight(int(self.config.get("height", 220)))
+        self.apply_size()
         self.icon_label.setAlignment(Qt.AlignCenter)
         self.summary_label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
         self.summary_label.setAlignment(Qt.AlignCenter)
@@ -707,7 +890,12 @@ class CenterYawn(BaseYawn):
         self.main_layout.addWidget(self.text_container, stretch=1)
         self.main_layout.addWidget(self.bar)
 
-        self.update_content()
+        if info_dict is not None:
+            self.bind(info_dict)
+
+    def apply_size(self):
+        self.main_widget.setMinimumWidth(self.config.width)
+        self.main_widget.setMaximumHeight(self.config.height)
 
     def _create_clone(self, screen):
         return CenterYawn(
@@ -718,21 +906,6 @@ class CenterYawn(BaseYawn):
             _primary=self,
         )
 
-    def update_position(self):
-        # CenterYawn doesn't need complex mirror logic, just center on target screen
-        # super().update_position() # BaseYawn update_position does nothing
-        self_width = self.size().width()
-        self_height = self.size().height()
-        screen = self.get_target_screen()
-        geo = screen.geometry()
-        offset_x = geo.x() + (geo.width() - self_width) // 2
-        offset_y = geo.y() + (geo.height() - self_height) // 2
-        self.move(offset_x, offset_y)
-        
-        if not self.is_clone:
-            for clone in self.clones:
-                clone.update_position()
-
     def close(self):
         self._close_clones()
         if not self.is_clone and self in self.app.yawn_arrays["CenterYawn"]:
@@ -741,19 +914,19 @@ class CenterYawn(BaseYawn):
 
 
 class MediaYawn(BaseYawn):
+    section = "media"
+    icon_label_type = SpinningLabel
+
     def __init__(
         self,
         app,
         config,
-        info_dict,
+        info_dict=None,
         parent=None,
         _clone_for_screen=None,
         _primary=None,
     ):
-        if "media" in config:
-            self.config = config["media"]
-        else:
-            self.config = {}
+        self.config = config.media
         self._full_config = config
         self.wm_class = "media - yawn"
         super().__init__(
@@ -764,28 +937,28 @@ class MediaYawn(BaseYawn):
             _clone_for_screen=_clone_for_screen,
             _primary=_primary,
         )
-        self.setFixedWidth(int(self.config.get("width", 400)))
-        self.setMaximumHeight(int(self.config.get("height", 500)))
-        
-        if not self.is_clone:
-            self.index = len(app.yawn_arrays["CornerYawn"]) # Uses CornerYawn index? Maintained as per original code
-            app.yawn_arrays[self.yawn_class].append(self)
-        else:
-            self.index = -1
+        self.apply_size()
 
         self.setWindowTitle("yawns - Media")
         self.setup_widgets()
         self.setup_side_icon_layout()
 
-        # Timer for rotating the icon
-        self.icon_timer = QTimer()
-        fps = int(self.config.get("fps", 30))
-        self.icon_timer.setInterval(round(1000 / fps))
-        self.icon_timer.timeout.connect(lambda: self.rotate_icon(5))
         self.result_pixmap = None
-        self.angle = 0
+        self.icon_size = 0
+        self.media_key = None
 
-        self.update_content()
+        if info_dict is not None:
+            self.bind(info_dict)
+
+    def apply_size(self):
+        self.setFixedWidth(self.config.width)
+        self.setMaximumHeight(self.config.height)
+
+    def reset(self):
+        super().reset()
+        self.app.animation_clock.unregister(self)
+        self.result_pixmap = None
+        self.media_key = None
 
     def _create_clone(self, screen):
         return MediaYawn(
@@ -799,161 +972,162 @@ class MediaYawn(BaseYawn):
     def rotate_icon(self, angle_increment):
         if self.result_pixmap is None:
             return
-        rotated_pixmap = QPixmap(self.result_pixmap.size())
-        rotated_pixmap.fill(Qt.transparent)
-
-        painter = QPainter(rotated_pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-
-        center = self.result_pixmap.rect().center()
-        painter.translate(center.x() + 1, center.y() + 1)
-        self.angle += angle_increment
-        painter.rotate(self.angle)
-        painter.translate(-center.x() - 1, -center.y() - 1)
-
-        painter.drawPixmap(0, 0, self.result_pixmap)
-        painter.end()
-        self.icon_label.setPixmap(rotated_pixmap)
+        self.icon_label.rotate(angle_increment)
 
     def update_icon(self):
         """
-        Update the spinning image on top of the vynil icon_label
+        Update the spinning image on top of the vynil icon_label.
+        It's composed in the background, the current one keeps
+        spinning until the new one is ready.
         """
-        self.icon_size = 0
-        if self.info_dict.get("img_byte_arr", None):
-            image_pixmap = QPixmap()
-            if image_pixmap.loadFromData(self.info_dict["img_byte_arr"]):
-                self.icon_size = int(self.config.get("icon-size", 64))
-                # Crop the image to a square
-                original_width = image_pixmap.width()
-                original_height = image_pixmap.height()
-                size = min(original_width, original_height)
-                rect = (
-                    (original_width - size) // 2,
-                    (original_height - size) // 2,
-                    size,
-                    size,
-                )
-                image_pixmap = image_pixmap.copy(*rect)
-
-                scaled_size = round(self.icon_size * 0.5)
-                # Scale the cropped square
-                image_pixmap = image_pixmap.scaled(
-                    scaled_size,
-                    scaled_size,
-                    Qt.KeepAspectRatioByExpanding,
-                    Qt.SmoothTransformation,
-                )
-
-                # Create a rounded pixmap
-                rounded_pixmap = QPixmap(scaled_size, scaled_size)
-                rounded_pixmap.fill(Qt.transparent)
-
-                painter = QPainter(rounded_pixmap)
-                painter.setRenderHint(QPainter.Antialiasing)
-                path = QPainterPath()
-                path.addEllipse(0, 0, scaled_size, scaled_size)
-                painter.setClipPath(path)
-                painter.drawPixmap(0, 0, image_pixmap)
-                painter.end()
-
-                vinyl_path = "/usr/share/yawns/assets/vinyl.png"
-                if self.config.get("bg_icon"):
-                    vinyl_path = os.path.expanduser(self.config["bg_icon"])
-                vinyl_pixmap = QPixmap()
-                if not vinyl_pixmap.load(vinyl_path):
-                    print(
-                        f"Failed to load {vinyl_path} for a media yawn, defaulting to /usr/share/yawns/assets/vinyl.png"
-                    )
-                    vinyl_path = "/usr/share/yawns/assets/vinyl.png"
-                    vinyl_pixmap.load(vinyl_path)
-
-                vinyl_pixmap = vinyl_pixmap.scaled(
-                    self.icon_size,
-                    self.icon_size,
-                    Qt.IgnoreAspectRatio,
-                    Qt.SmoothTransformation,
-                )
-                self.result_pixmap = QPixmap(vinyl_pixmap.size())
-                self.result_pixmap.fill(Qt.transparent)
-
-                painter = QPainter(self.result_pixmap)
-                painter.setRenderHint(QPainter.Antialiasing)
-                painter.drawPixmap(0, 0, vinyl_pixmap)
-
-                x = (vinyl_pixmap.width() - rounded_pixmap.width()) // 2
-                y = (vinyl_pixmap.height() - rounded_pixmap.height()) // 2
-                painter.drawPixmap(x, y, rounded_pixmap)
-                painter.end()
+        icon_size = self.setting("icon_size")
+        vinyl_path = "/usr/share/yawns/assets/vinyl.png"
+        if self.config.bg_icon:
+            vinyl_path = os.path.expanduser(self.config.bg_icon)
+
+        img_key = self.info_dict.get("img_key", None)
+        has_image = bool(
+            self.info_dict.get("img_raw", None)
+            or self.info_dict.get("img_byte_arr", None)
+        )
+        key = (
+            img_key,
+            "media",
+            icon_size,
+            vinyl_path,
+            self.devicePixelRatioF(),
+            self.info_dict.get("app_icon", ""),
+            has_image,
+        )
+        # Keep spinning the current vinyl while the new image loads
+        if self.info_dict.get("image_pending", False) and "icon" in self.shown:
+            return
+        if not self.changed("icon", key):
+            return
+        self.media_key = key
+
+        pixmap = self.app.pixmap_cache.get(key) if img_key else None
+        if pixmap is not None:
+            self.set_vinyl(pixmap, icon_size)
+        elif has_image:
+            self.app.media_compositor.compose(
+                key, self.info_dict, icon_size, vinyl_path, self.vinyl_composed
+            )
+        else:
+            self.set_vinyl(None, icon_size)
 
-                self.icon_label.setPixmap(self.result_pixmap)
-                self.icon_label.setMinimumSize(0, 0)
-                self.icon_label.setMaximumSize(100000, 100000)
+    def sync_icon(self):
+        pixmap = self.primary.result_pixmap
+        if self.changed("icon", pixmap and pixmap.cacheKey()):
+            self.set_vinyl(pixmap, self.primary.icon_size)
 
-                self.icon_timer.start()
-            else:
-                self.result_pixmap = None
-                self.icon_label.clear()
-                self.icon_label.setFixedSize(0, 0)
+    def vinyl_composed(self, key, pixmap):
+        # Dropped if the yawn moved on to another image meanwhile
+        if key != self.media_key:
+            return
+        had_vinyl = self.result_pixmap is not None
+        self.set_vinyl(pixmap, key[2])
+        if had_vinyl != (pixmap is not None):
+            self.update_text_width()
+            if self.isVisible():
+                self.adjust_size()
+                self.app.layout_yawns()
+
+    def set_vinyl(self, pixmap, icon_size):
+        self.result_pixmap = pixmap
+        for clone in self.clones:
+            clone.set_vinyl(pixmap, icon_size)
+        if pixmap is not None:
+            self.icon_size = icon_size
+            self.icon_label.setPixmap(pixmap)
+            self.icon_label.setMinimumSize(0, 0)
+            self.icon_label.setMaximumSize(100000, 100000)
+
+            # Spin it on the app's animation clock
+            self.app.animation_clock.register(self, lambda: self.rotate_icon(5))
         else:
-            self.result_pixmap = None
+            self.icon_size = 0
+            self.app.animation_clock.unregister(self)
             self.icon_label.clear()
             self.icon_label.setFixedSize(0, 0)
 
-    def update_content(self):
-        self.restart_timer()
-        self.update_icon()
-
-        layout_remaining_width = self.calculate_text_container_width(
-            "#MediaYawn", "#MediaYawnIcon"
+    def update_text_width(self):
+        self.text_container.setFixedWidth(
+            self.calculate_text_container_width("#MediaYawn", "#MediaYawnIcon")
         )
-        self.text_container.setFixedWidth(layout_remaining_width)
-
-        self.update_text()
-        self.update_bar()
-        self.update_buttons()
-        
-        if not self.is_clone:
-            self._update_clones()
-
-    def update_position(self):
-        if self.is_clone and self.primary:
-            p_screen = self.primary.get_target_screen()
-            p_geo = p_screen.geometry()
-            m_geo = self.get_target_screen().geometry()
-            
-            rel_x = self.primary.x() - p_geo.x()
-            rel_y = self.primary.y() - p_geo.y()
-            
-            self.move(m_geo.x() + rel_x, m_geo.y() + rel_y)
-            return
 
-        offset_x = int(self.config.get("x-offset", 40))
-        offset_y = int(self.config.get("y-offset", -40))
-        corner_width = self.width()
-        corner_height = self.height()
-        screen = self.get_target_screen()
-        geo = screen.geometry()
+    def stack_position(self, geo, stack_offset):
+        offset_x = self.config.x_offset
+        offset_y = self.config.y_offset
 
         if offset_x < 0:
-            offset_x = geo.x() + geo.width() + offset_x - corner_width
+            offset_x = geo.x() + geo.width() + offset_x - self.width()
         else:
             offset_x = geo.x() + offset_x
 
         if offset_y < 0:
-            offset_y = geo.y() + geo.height() + offset_y - corner_height
+            offset_y = geo.y() + geo.height() + offset_y - self.height()
         else:
             offset_y = geo.y() + offset_y
 
-        self.move(offset_x, offset_y)
-        
-        if not self.is_clone:
-            for clone in self.clones:
-                clone.update_position()
+        return QPoint(offset_x, offset_y)
 
     def close(self):
         self._close_clones()
+        self.app.animation_clock.unregister(self)
         if not self.is_clone and self in self.app.yawn_arrays[self.yawn_class]:
             self.app.yawn_arrays[self.yawn_class].remove(self)
         return super().close()
+
+
+class OverflowYawn(QWidget):
+    """
+    Compact yawn at the far end of a stack, telling how many
+    notifications are waiting for a free slot
+    """
+
+    def __init__(self, app, config, yawn_type):
+        super().__init__()
+        self.app = app
+        self.config = config
+        self.yawn_type = yawn_type
+        self.yawn_class = yawn_type.__name__
+        self.wm_class = "overflow - yawn"
+        self.urgency = 1
+        self.clones = []
+        self.pending_map = False
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setWindowTitle("yawns - Overflow")
+
+        self.main_container_layout = QVBoxLayout(self)
+        self.main_container_layout.setContentsMargins(0, 0, 0, 0)
+        self.main_widget = QFrame()
+        self.main_widget.setObjectName(self.yawn_class + "Overflow")
+        self.main_container_layout.addWidget(self.main_widget)
+        self.main_layout = QVBoxLayout(self.main_widget)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel()
+        self.label.setObjectName(self.yawn_class + "OverflowLabel")
+        self.label.setAlignment(Qt.AlignCenter)
+        self.main_layout.addWidget(self.label)
+
+        self.apply_settings(config)
+        self.app.setup_yawn_window(self)
+
+    def apply_settings(self, config):
+        self.config = config
+        self.setFixedWidth(config.width)
+
+    def set_count(self, count):
+        self.label.setText(f"+{count} more")
+        self.adjustSize()
+
+    def get_target_screen(self):
+        # Follows the newest yawn of its type
+        yawns = self.app.yawn_arrays[self.yawn_class]
+        if yawns:
+            return yawns[-1].get_target_screen()
+        return self.app.primaryScreen()
+
+    def stack_position(self, geo, stack_offset):
+        return self.yawn_type.stack_position(self, geo, stack_offset)
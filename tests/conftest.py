@@ -0,0 +1,142 @@
+import os
+import sys
+import configparser
+
+import pytest
+
+# The modules live flat in src/, as they get installed
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+CONFIG = os.path.join(SRC, "config.ini")
+STYLE = os.path.join(SRC, "style.qss")
+
+
+def stock_settings(**sections):
+    """
+    Settings from the stock config.ini, with the options in sections
+    ({"corner": {"monitor": "all"}}) changed, named as in config.ini
+    """
+    from settings import parse_settings
+
+    parser = configparser.ConfigParser()
+    parser.read(CONFIG)
+    for section, options in sections.items():
+        for option, value in options.items():
+            parser[section][option] = str(value)
+    return parse_settings(CONFIG, parser)
+
+
+@pytest.fixture(scope="session")
+def qt_app():
+    pytest.importorskip("PyQt5")
+    from yawns_app import YawnsApp
+
+    app = YawnsApp(["yawns"], {}, stock_settings(), STYLE)
+    # No window manager to talk to
+    app.setup_yawn_window = lambda yawn: None
+    app.setQuitOnLastWindowClosed(False)
+    return app
+
+
+@pytest.fixture
+def yawns_app(qt_app):
+    """
+    The app, with every yawn closed and the stock settings and
+    screens back once the test is done
+    """
+    yield qt_app
+    for id in list(qt_app.registry.by_id):
+        qt_app.close_notification(id)
+    qt_app.__dict__.pop("screens", None)
+    qt_app.apply_settings(stock_settings())
+    qt_app.processEvents()
+
+
+@pytest.fixture
+def configure(yawns_app):
+    """
+    Apply the stock settings with some options changed,
+    see stock_settings
+    """
+
+    def configure(**sections):
+        yawns_app.apply_settings(stock_settings(**sections))
+
+    return configure
+
+
+@pytest.fixture
+def make_info():
+    """
+    Factory for the info_dicts the manager hands to the app
+    """
+    from dbus_next import Variant
+
+    def make_info(id, yawn_type=1, image=None, **fields):
+        info_dict = {
+            "app_name": "test",
+            "replaces_id": 0,
+            "notification_id": id,
+            "app_icon": "",
+            "summary": f"Summary {id}",
+            "body": f"Body of notification {id}",
+            "actions": [],
+            "hints": {"yawn_type": Variant("i", yawn_type)},
+            "expire_timeout": 0,
+            "sender_id": ":1.1",
+            "img_byte_arr": None,
+            "img_raw": None,
+            "img_key": "",
+            "image_pending": False,
+        }
+        if image is not None:
+            # Solid 64x64 RGBA image, the byte picks its colour
+            info_dict["img_raw"] = {
+                "width": 64,
+                "height": 64,
+                "rowstride": 64 * 4,
+                "has_alpha": True,
+                "bits_per_sample": 8,
+                "channels": 4,
+                "buffer": bytes([image, 0, 255, 255]) * (64 * 64),
+            }
+            info_dict["img_key"] = f"test-{image}"
+        info_dict.update(fields)
+        return info_dict
+
+    return make_info
+
+
+class FakeScreen:
+    """
+    Stand-in for a QScreen, the offscreen platform only has one
+    """
+
+    def __init__(self, x):
+        from PyQt5.QtCore import QRect
+
+        self.rect = QRect(x, 0, 1920, 1080)
+
+    def geometry(self):
+        return self.rect
+
+    def devicePixelRatio(self):
+        return 1.0
+
+
+@pytest.fixture
+def fake_screens(yawns_app):
+    """
+    Factory giving the app count screens, its real one first
+    """
+
+    def fake_screens(count):
+        screens = [yawns_app.primaryScreen()] + [
+            FakeScreen(1920 * i) for i in range(1, count)
+        ]
+        yawns_app.screens = lambda: screens
+        return screens
+
+    return fake_screens
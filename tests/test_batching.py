@@ -0,0 +1,37 @@
+import time
+
+BURST = 50
+
+
+def test_burst_is_committed_in_one_pass(yawns_app, configure, make_info):
+    """
+    Notifications arriving in the same event loop iteration get their
+    yawns built, laid out once and mapped together
+    """
+    configure(corner={"max-visible": BURST})
+    yawns_app.processEvents()
+    mapped = []
+    yawns_app.yawns_mapped.connect(mapped.append)
+    passes = yawns_app.stack_layout.passes
+    moves = yawns_app.stack_layout.moves
+
+    try:
+        start = time.perf_counter()
+        for id in range(1, BURST + 1):
+            yawns_app.queue_notification(make_info(id))
+        # Nothing is built until control gets back to the event loop
+        assert len(yawns_app.registry) == 0
+        deadline = start + 5
+        while not mapped and time.perf_counter() < deadline:
+            yawns_app.processEvents()
+        latency = time.perf_counter() - start
+    finally:
+        yawns_app.yawns_mapped.disconnect(mapped.append)
+
+    assert mapped == [BURST]
+    assert yawns_app.stack_layout.passes == passes + 1
+    # Each new yawn is placed once, before it's mapped
+    assert yawns_app.stack_layout.moves - moves <= BURST
+    yawns = [yawns_app.registry.get(id) for id in range(1, BURST + 1)]
+    assert all(yawn.isVisible() for yawn in yawns)
+    assert latency < 1, f"{BURST} notifications took {latency * 1000:.1f} ms"
@@ -0,0 +1,81 @@
+import timeit
+
+import yawns_notifications
+
+
+def show_on_screens(app, configure, make_info, fake_screens, count, id):
+    fake_screens(count)
+    configure(corner={"monitor": "all"})
+    app.queue_notification(make_info(id, image=0))
+    app.commit_notifications()
+    app.processEvents()
+    yawn = app.registry.get(id)
+    assert len(yawn.clones) == count - 1
+    return yawn
+
+
+def test_clones_share_the_primary_content(
+    yawns_app, configure, make_info, fake_screens, monkeypatch
+):
+    yawn = show_on_screens(yawns_app, configure, make_info, fake_screens, 4, 1)
+
+    decoded = []
+    load_icon_image = yawns_notifications.load_icon_image
+    monkeypatch.setattr(
+        yawns_notifications,
+        "load_icon_image",
+        lambda info_dict: decoded.append(info_dict) or load_icon_image(info_dict),
+    )
+    # Without a key the image can't be shared through the pixmap cache
+    yawns_app.select_yawn_type(make_info(1, image=1, img_key="", summary="Updated"))
+
+    # Only the primary decodes the new image, the clones take its pixmap
+    assert len(decoded) == 1
+    pixmap_key = yawn.icon_label.pixmap().cacheKey()
+    for clone in yawn.clones:
+        assert clone.icon_label.pixmap().cacheKey() == pixmap_key
+        assert clone.summary_label.text() == yawn.summary_label.text()
+        assert clone.size() == yawn.size()
+
+
+def test_update_cost_barely_grows_with_screens(
+    yawns_app, configure, make_info, fake_screens
+):
+    """
+    Clones reuse what the primary worked out, each screen added to a
+    yawn should cost a small part of a full update
+    """
+
+    def cost(screens, id):
+        yawn = show_on_screens(yawns_app, configure, make_info, fake_screens, screens, id)
+        updates = iter(range(1, 10000))
+
+        def update():
+            image = next(updates)
+            yawns_app.select_yawn_type(
+                make_info(
+                    id,
+                    image=image % 256,
+                    # Nothing cached by an earlier run
+                    img_key=f"clones-{id}-{image}",
+                    summary=f"Update {image}",
+                    actions=["default", "Open", "reply", "Reply"],
+                )
+            )
+            yawn.adjust_size()
+
+        time = min(timeit.repeat(update, number=10, repeat=20))
+        yawns_app.close_notification(id)
+        yawns_app.processEvents()
+        return time
+
+    # Warm up whatever gets set up once
+    cost(1, 1)
+    one = cost(1, 2)
+    two = cost(2, 3)
+    four = cost(4, 4)
+    report = f"1 screen: {one:.4f}s, 2 screens: {two:.4f}s, 4 screens: {four:.4f}s"
+    # Every screen past the first costs under half a single screen update
+    assert two - one < one * 0.5, report
+    assert (four - two) / 2 < one * 0.5, report
+    assert four < one * 2.5, report
@@ -0,0 +1,168 @@
+import asyncio
+import configparser
+import shutil
+import subprocess
+
+import pytest
+
+dbus_next = pytest.importorskip("dbus_next")
+from dbus_next.aio import MessageBus
+from dbus_next.constants import MessageType
+from dbus_next.message import Message
+
+from yawns_manager import acquire_service
+
+CLIENTS = 16
+PER_CLIENT = 25
+# Calls each client keeps in flight. dbus-next drops writes once a
+# socket's buffer fills up, so don't queue everything at once
+IN_FLIGHT = 5
+
+
+@pytest.fixture
+def session_bus(tmp_path, monkeypatch):
+    """
+    A private session bus, so the test never touches the user's
+    notification service
+    """
+    if shutil.which("dbus-daemon") is None:
+        pytest.skip("dbus-daemon is not installed")
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    address = daemon.stdout.readline().strip()
+    monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", address)
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    yield address
+    daemon.terminate()
+    daemon.wait()
+
+
+def stress_config():
+    config = configparser.ConfigParser()
+    config.read_dict(
+        {
+            "general": {"history-size": "0"},
+            "admission": {"rate": "0", "dedup-window": "0"},
+        }
+    )
+    return config
+
+
+async def stress():
+    bus, manager = await acquire_service(stress_config())
+    assert manager is not None
+
+    # What the GUI would do: answer closes with NotificationClosed
+    # sent to the sender the manager attributes the notification to
+    shown = {}
+    manager.notify_app = lambda info_dict: shown.__setitem__(
+        info_dict["notification_id"], info_dict["sender_id"]
+    )
+
+    def close_notification(id, reason, sender_id):
+        bus.send(
+            Message(
+                destination=sender_id,
+                message_type=MessageType.SIGNAL,
+                signature="uu",
+                interface="org.freedesktop.Notifications",
+                path="/org/freedesktop/Notifications",
+                member="NotificationClosed",
+                body=[id, reason],
+            )
+        )
+        manager.forget_notification(id)
+
+    manager.close_notification = close_notification
+
+    clients = [await MessageBus().connect() for _ in range(CLIENTS)]
+    closed = {client.unique_name: [] for client in clients}
+
+    def closed_handler(name):
+        def handler(message):
+            if message.member == "NotificationClosed":
+                closed[name].append(message.body[0])
+
+        return handler
+
+    for client in clients:
+        client.add_message_handler(closed_handler(client.unique_name))
+        await client.call(
+            Message(
+                destination="org.freedesktop.DBus",
+                path="/org/freedesktop/DBus",
+                interface="org.freedesktop.DBus",
+                member="AddMatch",
+                signature="s",
+                body=["type='signal',member='NotificationClosed'"],
+            )
+        )
+
+    def call(client, member, signature, body):
+        return client.call(
+            Message(
+                destination="org.freedesktop.Notifications",
+                path="/org/freedesktop/Notifications",
+                interface="org.freedesktop.Notifications",
+                member=member,
+                signature=signature,
+                body=body,
+            )
+        )
+
+    async def notify(client, index):
+        reply = await call(
+            client,
+            "Notify",
+            "susssasa{sv}i",
+            ["stress", 0, "", f"{client.unique_name} {index}", "", [], {}, 0],
+        )
+        return reply.body[0]
+
+    async def run_client(client):
+        client_ids = []
+        for start in range(0, PER_CLIENT, IN_FLIGHT):
+            client_ids += await asyncio.gather(
+                *(
+                    notify(client, index)
+                    for index in range(start, min(start + IN_FLIGHT, PER_CLIENT))
+                )
+            )
+        for start in range(0, PER_CLIENT, IN_FLIGHT):
+            await asyncio.gather(
+                *(
+                    call(client, "CloseNotification", "u", [id])
+                    for id in client_ids[start : start + IN_FLIGHT]
+                )
+            )
+        return client_ids
+
+    # Every client's calls interleave with everyone else's
+    ids = await asyncio.gather(*(run_client(client) for client in clients))
+    # Let the last signals arrive
+    await asyncio.sleep(0.2)
+
+    for client in clients:
+        client.disconnect()
+    manager.image_decoder.shutdown()
+    bus.disconnect()
+    return clients, ids, shown, closed, manager
+
+
+def test_sender_attribution_under_concurrency(session_bus):
+    clients, ids, shown, closed, manager = asyncio.run(
+        asyncio.wait_for(stress(), 30)
+    )
+
+    all_ids = [id for client_ids in ids for id in client_ids]
+    assert len(set(all_ids)) == CLIENTS * PER_CLIENT
+    for client, client_ids in zip(clients, ids):
+        name = client.unique_name
+        # Every notification is attributed to the connection that sent it
+        assert all(shown[id] == name for id in client_ids)
+        # and only that connection hears about it being closed
+        assert sorted(closed[name]) == sorted(client_ids)
+    assert manager.notification_senders == {}
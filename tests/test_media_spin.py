@@ -0,0 +1,89 @@
+import os
+import time
+
+VINYL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "vinyl.png"
+)
+
+
+def spinning_yawn(app, configure, make_info, fake_screens, screens):
+    """
+    A media yawn with its vinyl composed, on screens monitors
+    """
+    fake_screens(screens)
+    configure(media={"bg-icon": VINYL, "monitor": "all"})
+    app.queue_notification(make_info(1, yawn_type=3, image=1))
+    app.commit_notifications()
+    yawn = app.registry.get(1)
+    deadline = time.monotonic() + 5
+    while yawn.result_pixmap is None and time.monotonic() < deadline:
+        app.processEvents()
+    assert yawn.result_pixmap is not None
+    # Let the layout settle around the new vinyl
+    size = None
+    while size != yawn.size():
+        size = yawn.size()
+        app.processEvents()
+    return yawn
+
+
+def spin(yawns, frames):
+    for _ in range(frames):
+        for yawn in yawns:
+            yawn.rotate_icon(5)
+            yawn.icon_label.repaint()
+
+
+def test_spin_keeps_pixmap_and_layout(yawns_app, configure, make_info, fake_screens):
+    yawn = spinning_yawn(yawns_app, configure, make_info, fake_screens, 1)
+    label = yawn.icon_label
+    pixmap_key = label.pixmap().cacheKey()
+    geometry = label.geometry()
+
+    spin([yawn], 30)
+    yawns_app.processEvents()
+    assert label.angle == 150
+    assert label.pixmap().cacheKey() == pixmap_key
+    assert label.geometry() == geometry
+
+    # The frame clock only runs while a spinning yawn is on screen
+    assert yawns_app.animation_clock.timer.isActive()
+    yawn.hide()
+    yawns_app.processEvents()
+    assert not yawns_app.animation_clock.timer.isActive()
+
+
+def spin_cpu(app, configure, make_info, fake_screens, monitors):
+    """
+    CPU time taken by a second of frames from the animation clock,
+    painting included, with the media yawn on monitors screens
+    """
+    yawn = spinning_yawn(app, configure, make_info, fake_screens, monitors)
+    assert len(yawn.clones) == monitors - 1
+    fps = app.settings.media.fps
+
+    def second():
+        start = time.process_time()
+        for _ in range(fps):
+            app.animation_clock.tick()
+            app.processEvents()
+        return time.process_time() - start
+
+    second()
+    cpu = min(second() for _ in range(5))
+    app.close_notification(1)
+    app.processEvents()
+    return cpu
+
+
+def test_spin_cpu_per_second(yawns_app, configure, make_info, fake_screens):
+    """
+    Every monitor paints its own vinyl, but besides that a clone should
+    add nothing: per monitor, spinning on three costs about what it
+    does on one. A second of it should take a small part of a core.
+    """
+    one = spin_cpu(yawns_app, configure, make_info, fake_screens, 1)
+    three = spin_cpu(yawns_app, configure, make_info, fake_screens, 3)
+    report = f"1 monitor: {one * 1000:.1f} ms/s, 3 monitors: {three * 1000:.1f} ms/s"
+    assert three / 3 < one * 1.5, report
+    assert three < 0.25, report
@@ -0,0 +1,84 @@
+import timeit
+import configparser
+
+from dbus_next import Variant
+
+from routing import Router
+
+
+def router(sections):
+    config = configparser.ConfigParser()
+    config.read_dict(sections)
+    return Router(config)
+
+
+def notification(app_name, category=None, urgency=1):
+    hints = {"urgency": Variant("y", urgency)}
+    if category:
+        hints["category"] = Variant("s", category)
+    return {
+        "app_name": app_name,
+        "summary": "Summary",
+        "body": "Body",
+        "sender_id": ":1.42",
+        "hints": hints,
+    }
+
+
+def many_rules(count):
+    """
+    count rules for plain app names, plus a few with patterns
+    """
+    sections = {
+        f"rule:app{i}": {"app_name": f"app{i}", "yawn": "center"} for i in range(count)
+    }
+    sections["rule:volume"] = {"category": "x-volume*", "yawn": "center"}
+    sections["rule:mail"] = {"summary": "*mail*", "yawn": "corner", "priority": "2"}
+    sections["media"] = {"app_name": "mpv spotify*"}
+    return sections
+
+
+def test_highest_priority_wins():
+    rules = router(
+        {
+            "media": {"app_name": "mpv"},
+            "rule:volume": {
+                "category": "x-volume*",
+                "yawn": "center",
+                "priority": "10",
+                "timeout": "1500",
+            },
+            "rule:critical": {"urgency": "critical", "yawn": "corner"},
+        }
+    )
+    rule = rules.route(notification("mpv", "x-volume.change"))
+    assert rule.name == "volume"
+    assert rule.overrides == {"timeout": 1500}
+    assert rules.route(notification("mpv")).yawn_type == 3
+    assert rules.route(notification("mpv", urgency=2)).name == "critical"
+    assert rules.route(notification("firefox")) is None
+
+
+def test_route_cost_does_not_grow_with_rules():
+    """
+    Rules for plain app names are indexed, routing through a thousand of
+    them should cost about the same as through ten
+    """
+    notifications = [
+        notification(app_name, category)
+        for app_name in ("app5", "firefox", "spotify-client", "mpv")
+        for category in (None, "x-volume.change", "email.arrived")
+    ]
+
+    def cost(count):
+        rules = router(many_rules(count))
+
+        def route_all():
+            for info_dict in notifications:
+                rules.route(info_dict)
+
+        return min(timeit.repeat(route_all, number=200, repeat=5))
+
+    few = cost(10)
+    many = cost(1000)
+    assert many < few * 3, f"10 rules: {few:.4f}s, 1000 rules: {many:.4f}s"
@@ -0,0 +1,60 @@
+import timeit
+
+
+def show(app, make_info, ids):
+    for id in ids:
+        app.queue_notification(make_info(id))
+    app.commit_notifications()
+    app.processEvents()
+    return [app.registry.get(id) for id in ids]
+
+
+def test_stacks_without_overlap(yawns_app, configure, make_info):
+    configure(corner={"max-visible": 200})
+    yawns = show(yawns_app, make_info, range(1, 21))
+    gap = yawns_app.settings.corner.gap
+
+    # The newest sits at the corner, the older ones stack up from it
+    for newer, older in zip(reversed(yawns), list(reversed(yawns))[1:]):
+        assert older.y() + older.height() + gap == newer.y()
+        assert older.x() == newer.x()
+
+    # Nothing changed, nothing moves
+    moves = yawns_app.stack_layout.moves
+    yawns_app.layout_yawns()
+    assert yawns_app.stack_layout.moves == moves
+
+
+def test_one_stack_per_screen(yawns_app, configure, make_info, fake_screens):
+    configure(corner={"max-visible": 200})
+    screens = fake_screens(3)[1:]
+    yawns = show(yawns_app, make_info, range(1, 7))
+    # As if monitor = focused had put them on alternate screens
+    for index, yawn in enumerate(yawns):
+        yawn.target_screen = screens[index % 2]
+    yawns_app.layout_yawns()
+
+    on_first, on_second = yawns[0::2], yawns[1::2]
+    for first, second in zip(on_first, on_second):
+        assert second.x() - first.x() == 1920
+        assert second.y() == first.y()
+
+
+def test_layout_cost_grows_linearly(yawns_app, configure, make_info):
+    """
+    A layout pass walks each stack once, four times the yawns should
+    take about four times as long (a quadratic pass would take sixteen)
+    """
+    configure(corner={"max-visible": 200})
+
+    def cost(count, first_id):
+        show(yawns_app, make_info, range(first_id, first_id + count))
+        time = min(timeit.repeat(yawns_app.stack_layout.layout, number=20, repeat=5))
+        for id in list(yawns_app.registry.by_id):
+            yawns_app.close_notification(id)
+        yawns_app.processEvents()
+        return time
+
+    few = cost(40, 1)
+    many = cost(160, 1000)
+    assert many < few * 8, f"40 yawns: {few:.4f}s, 160 yawns: {many:.4f}s"
@@ -9,3 +9,4 @@ pkgname=yawns
 
 rm -rf /usr/share/$pkgname
 rm -rf /usr/bin/$pkgname
+rm -f /usr/share/dbus-1/services/$pkgname.service